@@ -1,4 +1,5 @@
 from Qt import QtCore
+from Qt import QtGui
 
 
 class AnimationBase(QtCore.QObject):
@@ -66,3 +67,69 @@ class TranslateYAnimation(AnimationBase):
         self.ani.start()
 
     y = QtCore.Property(float, get_y, set_y)
+
+
+class AnimationTicker(QtCore.QObject):
+    """ Clock advancing the frame-stepped animations in one pass per frame
+
+    The registered callbacks are called with the elapsed milliseconds of
+    the clock once per display frame. The timer only runs while callbacks
+    are registered, a callback unregisters itself when its animation ends.
+    `QPropertyAnimation` already shares the `QUnifiedTimer` of Qt, this
+    clock drives the animations stepping their own state.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self._callbacks = {}
+        self._timer = None
+        self._clock = QtCore.QElapsedTimer()
+        self._clock.start()
+
+    def interval(self):
+        """ get the frame interval of the primary screen in milliseconds """
+        screen = QtGui.QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen else 0
+        return max(int(1000 / rate), 1) if rate > 0 else 16
+
+    def time(self):
+        """ get the elapsed milliseconds of the clock """
+        return self._clock.nsecsElapsed() / 1e6
+
+    def register(self, callback):
+        """ call `callback(time)` on every frame until it's unregistered """
+        self._callbacks[callback] = None
+        if self._timer is None:
+            self._timer = QtCore.QTimer(self)
+            self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+            self._timer.timeout.connect(self._tick)
+
+        if not self._timer.isActive():
+            self._timer.start(self.interval())
+
+    def unregister(self, callback):
+        self._callbacks.pop(callback, None)
+
+    def is_registered(self, callback):
+        return callback in self._callbacks
+
+    def is_active(self):
+        return self._timer is not None and self._timer.isActive()
+
+    def _tick(self):
+        now = self.time()
+        for callback in list(self._callbacks):
+            if callback not in self._callbacks:
+                continue
+
+            try:
+                callback(now)
+            except RuntimeError:
+                # the widget of the animation is deleted
+                self.unregister(callback)
+
+        if not self._callbacks:
+            self._timer.stop()
+
+
+animation_ticker = AnimationTicker()
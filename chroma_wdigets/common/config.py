@@ -5,10 +5,13 @@ from __future__ import print_function
 import os
 import json
 import codecs
-from tempfile import gettempdir
+import atexit
+import threading
+from contextlib import contextmanager
+from tempfile import gettempdir, mkstemp
 from enum import Enum
 
-from Qt.QtCore import QObject, Signal
+from Qt.QtCore import QObject, Signal, QTimer, QCoreApplication
 from Qt.QtGui import QColor
 
 PRIMARY_COLOR = "#8A379B"
@@ -100,6 +103,10 @@ class EnumSerializer(ConfigSerializer):
         return self.enumClass(value)
 
 
+# sentinel of an item without an unread value of the config file
+_MISSING = object()
+
+
 class ConfigItem(QObject):
     """ Config item """
 
@@ -139,8 +146,19 @@ class ConfigItem(QObject):
     def serialize(self):
         return self.serializer.serialize(self.value)
 
+    def deserialize(self, value):
+        """ deserialize the value, use the default value if it's invalid """
+        try:
+            return self.serializer.deserialize(value)
+        except (ValueError, TypeError, KeyError):
+            return self.defaultValue
+
     def deserialize_from(self, value):
-        self.value = self.serializer.deserialize(value)
+        self.value = self.deserialize(value)
+
+    def restore(self, value):
+        """ set the value without emitting `value_changed` """
+        self._value = self.validator.correct(value)
 
 
 class OptionsConfigItem(ConfigItem):
@@ -164,8 +182,225 @@ class ColorConfigItem(ConfigItem):
         return '{}[value={}]'.format(self.__class__.__name__, self.value.name())
 
 
+@contextmanager
+def atomic_path(path):
+    """ get a unique temporary path next to `path`, the temporary file
+    replaces `path` when the block exits without an exception """
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+
+    fd, tmp = mkstemp(dir=folder, prefix=os.path.basename(path) + '.',
+                      suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def write_json(path, data):
+    """ write data to the json file atomically """
+    with atomic_path(path) as tmp:
+        with codecs.open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+def file_stamp(path):
+    """ get the modification stamp of the file, `None` if it's missing """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return st.st_mtime_ns, st.st_size
+
+
+class ConfigSaver(QObject):
+    """ Write-behind saver of the config file
+
+    Save requests within `interval` milliseconds are coalesced into one
+    write, the config is serialized and written on a worker thread. Pending
+    changes are flushed when the application quits. Without a running
+    `QCoreApplication` the config is saved synchronously.
+
+    Parameters
+    ----------
+    config: QConfig
+        config to save
+
+    interval: int
+        coalescing window in milliseconds
+    """
+
+    def __init__(self, config, interval=300):
+        super(ConfigSaver, self).__init__()
+        self.config = config
+        self.interval = interval
+        self._app = None
+        self._pending = None
+        self._thread = None
+        self._busy = False
+        self._sequence = 0
+        self._written = 0
+        self._write_lock = threading.Lock()
+        self.stamp = None
+        self._condition = threading.Condition()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._submit)
+        atexit.register(self.flush)
+
+    def schedule(self):
+        """ save the config after the coalescing window """
+        app = QCoreApplication.instance()
+        if app is None:
+            self.save()
+            return
+
+        if app is not self._app:
+            self._app = app
+            app.aboutToQuit.connect(self.flush)
+
+        if not self._timer.isActive():
+            self._timer.start(self.interval)
+
+    def is_pending(self):
+        """ whether changes are waiting to be written or being written """
+        return (self._timer.isActive() or self._pending is not None or
+                self._busy)
+
+    def _snapshot(self):
+        self._sequence += 1
+        return self.config.file, self.config.to_dict(), self._sequence
+
+    def _submit(self):
+        with self._condition:
+            self._pending = self._snapshot()
+            self._condition.notify_all()
+
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name='ConfigSaver')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+
+                # taken and marked busy at once so flush() waits for it
+                pending, self._pending = self._pending, None
+                self._busy = True
+
+            try:
+                self._write(*pending)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write(self, path, data, sequence):
+        """ write the snapshot unless a newer one is already written """
+        with self._write_lock:
+            if sequence <= self._written:
+                return
+
+            try:
+                write_json(path, data)
+            except (IOError, OSError):
+                return
+
+            self._written = sequence
+            self.stamp = file_stamp(path)
+
+    def save(self):
+        """ write the config synchronously, dropping the pending changes """
+        self._timer.stop()
+        with self._condition:
+            self._pending = None
+
+        self._write(*self._snapshot())
+
+    def flush(self):
+        """ write the pending changes synchronously """
+        pending = None
+        if self._timer.isActive():
+            self._timer.stop()
+            pending = self._snapshot()
+
+        with self._condition:
+            pending = pending or self._pending
+            self._pending = None
+
+            # wait for the write in progress
+            while self._busy:
+                self._condition.wait()
+
+        if pending:
+            self._write(*pending)
+
+
+class ConfigWatcher(QObject):
+    """ Watcher of the config file modified by other processes
+
+    The file is polled with `os.stat`, which costs a few microseconds, and
+    reloaded when its stamp changes. The writes of this process are ignored
+    and the file isn't reloaded while local changes wait to be written.
+    `QFileSystemWatcher` isn't used because the atomic replace of the saver
+    drops the watch of the file on some platforms.
+
+    Parameters
+    ----------
+    config: QConfig
+        config to reload
+
+    interval: int
+        polling interval in milliseconds
+    """
+
+    def __init__(self, config, interval=1000):
+        super(ConfigWatcher, self).__init__(config)
+        self.config = config
+        self._stamp = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.poll)
+
+    def start(self, interval=None):
+        if interval:
+            self._timer.setInterval(interval)
+
+        self._stamp = file_stamp(self.config.file)
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def is_active(self):
+        return self._timer.isActive()
+
+    def poll(self):
+        """ reload the config if the file was modified by another process """
+        if self.config.saver.is_pending():
+            # local changes win, the file is checked again after the write
+            return
+
+        stamp = file_stamp(self.config.file)
+        if stamp == self._stamp:
+            return
+
+        self._stamp = stamp
+        if stamp is not None and stamp != self.config.saver.stamp:
+            self.config.reload()
+
+
 class QConfig(QObject):
     app_restarted = Signal()
+    external_changed = Signal(list)
     theme_changed = Signal(Theme)
     theme_color_changed = Signal(QColor)
 
@@ -178,38 +413,150 @@ class QConfig(QObject):
         super(QConfig, self).__init__()
         self.file = os.path.join(gettempdir(), "chroma_widgets/config.json")
         self._theme = Theme.DARK
+        self._unloaded = {}
+        self._batch_depth = 0
+        self._batch_changes = {}
+        self._batch_save = False
+        self._batch_callbacks = []
+        self.saver = ConfigSaver(self)
+        self.watcher = ConfigWatcher(self)
+
+    def __init_subclass__(cls, **kwargs):
+        super(QConfig, cls).__init_subclass__(**kwargs)
+        cls._build_registry()
+
+    @classmethod
+    def _build_registry(cls):
+        """ collect the config items of the class and its bases """
+        items = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, ConfigItem):
+                    items[name] = value
+
+        cls._config_items = items
+
+    @classmethod
+    def items(cls):
+        """ get the config items by attribute name """
+        return cls._config_items
 
     def get(self, item):
+        if self._unloaded and item in self._unloaded:
+            # reading a value is not a change, nothing is emitted
+            item.restore(item.deserialize(self._unloaded.pop(item)))
+
         return item.value
 
     def set(self, item, value, save=True):
+        # compare with the value of the config file if it isn't read yet
+        raw = self._unloaded.get(item, _MISSING)
+        self.get(item)
         if item.value == value:
             return
 
+        if self._batch_depth:
+            # the signals are emitted when the batch is committed, a rollback
+            # restores the value and keeps an unread item unread
+            self._batch_changes.setdefault(item, (item.value, raw))
+            item.restore(value)
+            self._batch_save = self._batch_save or save
+            return
+
         item.value = value
 
         if save:
-            self.save()
+            self.saver.schedule()
 
         if item.restart:
             self.app_restarted.emit()
 
+        self._emit_theme_changed(item)
+
+    def _emit_theme_changed(self, item):
         if item is self.theme_mode:
-            self.theme = value
-            self.theme_changed.emit(value)
+            self.theme = item.value
+            self.theme_changed.emit(item.value)
 
         if item is self.theme_color:
-            self.theme_color_changed.emit(value)
+            self.theme_color_changed.emit(item.value)
+
+    @contextmanager
+    def batch(self):
+        """ set several items as one change
+
+        The signals of each changed item are emitted once when the outermost
+        batch exits, the config is saved at most once and the callbacks of
+        `call_after_batch()` run after the signals. The items are restored
+        without emitting anything if the block raises an exception.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._rollback_batch()
+            raise
+
+        self._batch_depth -= 1
+        if not self._batch_depth:
+            self._commit_batch()
+
+    def is_batching(self):
+        return self._batch_depth > 0
+
+    def call_after_batch(self, func):
+        """ call `func` once after the current batch, or at once if there is
+        no batch """
+        if not self._batch_depth:
+            func()
+        elif func not in self._batch_callbacks:
+            self._batch_callbacks.append(func)
+
+    def _take_batch(self):
+        changes, self._batch_changes = self._batch_changes, {}
+        callbacks, self._batch_callbacks = self._batch_callbacks, []
+        save, self._batch_save = self._batch_save, False
+        return changes, callbacks, save
+
+    def _rollback_batch(self):
+        changes, _, _ = self._take_batch()
+        for item, (value, raw) in changes.items():
+            item.restore(value)
+            if raw is not _MISSING:
+                self._unloaded[item] = raw
+
+    def _commit_batch(self):
+        changes, callbacks, save = self._take_batch()
+        changed = [i for i, (v, _) in changes.items() if i.value != v]
+        if changed and save:
+            self.saver.schedule()
+
+        for item in changed:
+            item.value_changed.emit(item.value)
+
+        if any(i.restart for i in changed):
+            self.app_restarted.emit()
+
+        for item in changed:
+            self._emit_theme_changed(item)
+
+        for func in callbacks:
+            func()
 
     def to_dict(self, serialize=True):
         """ convert config items to `dict` """
         items = {}
-        for name in dir(self.__class__):
-            item = getattr(self.__class__, name)
-            if not isinstance(item, ConfigItem):
-                continue
+        for item in self._config_items.values():
+            if serialize and item in self._unloaded:
+                # unread items keep the value of the config file
+                value = self._unloaded[item]
+            elif serialize:
+                value = item.serialize()
+            else:
+                value = self.get(item)
 
-            value = item.serialize() if serialize else item.value
             if not items.get(item.group):
                 if not item.name:
                     items[item.group] = value
@@ -222,11 +569,82 @@ class QConfig(QObject):
         return items
 
     def save(self):
-        if not os.path.exists(os.path.dirname(self.file)):
-            os.makedirs(os.path.dirname(self.file))
+        """ save the config synchronously """
+        self.saver.save()
+
+    def load(self, file=None):
+        """ load the config file
+
+        The file is parsed once, the items are only deserialized when they
+        are read by `get()`, except the theme items which are applied at
+        once.
+
+        Parameters
+        ----------
+        file: str
+            config file, use `self.file` if it's `None`
+        """
+        if file:
+            self.file = file
+
+        unloaded = self._read()
+        if unloaded is None:
+            return
 
-        with codecs.open(self.file, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+        self._unloaded = unloaded
+        for item in (self.theme_mode, self.theme_color):
+            if item in unloaded:
+                self.set(item, item.deserialize(unloaded[item]), save=False)
+
+    def reload(self):
+        """ reload the items changed in the config file
+
+        Only the items whose value differs from the file are set, in one
+        batch, and `external_changed` is emitted with them.
+        """
+        values = self._read()
+        if values is None:
+            return []
+
+        changed = []
+        with self.batch():
+            for item, value in values.items():
+                if item in self._unloaded:
+                    # not read yet, nothing to notify
+                    self._unloaded[item] = value
+                elif item.serialize() != value:
+                    value = item.validator.correct(item.deserialize(value))
+                    if value != item.value:
+                        self.set(item, value, False)
+                        changed.append(item)
+
+        if changed:
+            self.external_changed.emit(changed)
+
+        return changed
+
+    def _read(self):
+        """ read the serialized values of the items in the config file """
+        try:
+            with codecs.open(self.file, encoding="utf-8") as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        values = {}
+        for item in self._config_items.values():
+            value = data.get(item.group)
+            if item.name:
+                if not isinstance(value, dict) or item.name not in value:
+                    continue
+
+                value = value[item.name]
+            elif value is None:
+                continue
+
+            values[item] = value
+
+        return values
 
     @property
     def theme(self):
@@ -237,9 +655,27 @@ class QConfig(QObject):
         self._theme = t
 
 
+QConfig._build_registry()
 qconfig = QConfig()
 
 
+def set_config_watcher_enabled(enabled=True, interval=1000):
+    """ set whether to reload the config file modified by other processes
+
+    Parameters
+    ----------
+    enabled: bool
+        whether to watch the config file
+
+    interval: int
+        polling interval in milliseconds
+    """
+    if enabled:
+        qconfig.watcher.start(interval)
+    else:
+        qconfig.watcher.stop()
+
+
 def is_dark_theme():
     return qconfig.theme == Theme.DARK
 
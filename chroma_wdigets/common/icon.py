@@ -1,15 +1,154 @@
+import os
+import threading
 from enum import Enum
+from collections import OrderedDict
 
-from Qt.QtWidgets import QAction
-from Qt.QtGui import QIcon, QIconEngine
-from Qt.QtCore import QFile, QRectF, Qt
+from Qt.QtWidgets import QAction, QApplication, QStyleOption
+from Qt.QtGui import QIcon, QIconEngine, QPixmap, QPainter, QImage, QColor
+from Qt.QtCore import QFile, QObject, QPointF, QRect, QRectF, Qt, Signal
 from Qt.QtXml import QDomDocument
 from Qt.QtSvg import QSvgRenderer
 
-from chroma_wdigets.common.config import Theme, RESOURCES_PATH
+from chroma_wdigets.common.config import (
+    Theme, RESOURCES_PATH, qconfig, atomic_path)
+from chroma_wdigets.common.vector_icon import vector_icon_bundle
+
+
+class LRUCache(object):
+    """ Least recently used cache
+
+    Parameters
+    ----------
+    capacity: int
+        maximum number of cached items
+    """
+
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        try:
+            value = self._items.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._items[key] = value
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._items.pop(key, None)
+        self._items[key] = value
+        self._trim()
+
+    def set_capacity(self, capacity):
+        self.capacity = capacity
+        self._trim()
+
+    def _trim(self):
+        while len(self._items) > max(self.capacity, 0):
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self, *args):
+        self._items.clear()
+
+    def stats(self):
+        """ Return the hit/miss/eviction counters and the number of items """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._items),
+            'capacity': self.capacity
+        }
+
+
+class PixmapCache(LRUCache):
+    """ Least recently used cache of pixmaps bounded by their size in bytes
+
+    Icons recolored with only a `fill` are tinted from the pixmap of the
+    original icon when `tint` is enabled.
+
+    Parameters
+    ----------
+    max_bytes: int
+        maximum total size of the cached pixmaps
+    """
+
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        super(PixmapCache, self).__init__(max_bytes)
+        self.enabled = True
+        self.tint = True
+        self.bytes = 0
+        self._costs = {}
+
+    @staticmethod
+    def cost(pixmap):
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    def set(self, key, pixmap):
+        self._discard(key)
+        cost = self.cost(pixmap)
+        if cost > self.capacity:
+            return
+
+        self._items[key] = pixmap
+        self._costs[key] = cost
+        self.bytes += cost
+        self._trim()
+
+    def _discard(self, key):
+        if self._items.pop(key, None) is not None:
+            self.bytes -= self._costs.pop(key)
+
+    def _trim(self):
+        while self.bytes > max(self.capacity, 0):
+            key, _ = self._items.popitem(last=False)
+            self.bytes -= self._costs.pop(key)
+            self.evictions += 1
+
+    def clear(self, *args):
+        super(PixmapCache, self).clear()
+        self._costs.clear()
+        self.bytes = 0
+
+    def stats(self):
+        stats = super(PixmapCache, self).stats()
+        stats['bytes'] = self.bytes
+        return stats
+
+
+svg_renderer_cache = LRUCache(128)
+svg_cache = LRUCache(256)
+icon_pixmap_cache = PixmapCache()
 
 
 def write_svg(icon_path, indexes=None, **attributes):
+    """ get the svg content with the attributes set on the path nodes, the
+    recolored content is cached """
+    key = (icon_path, tuple(indexes) if indexes else None,
+           tuple(sorted(attributes.items())))
+    svg = svg_cache.get(key)
+    if svg is None:
+        svg = _write_svg(icon_path, indexes, **attributes)
+        svg_cache.set(key, svg)
+
+    return svg
+
+
+def _write_svg(icon_path, indexes=None, **attributes):
     if not icon_path.lower().endswith(".svg"):
         return ""
 
@@ -33,8 +172,157 @@ def write_svg(icon_path, indexes=None, **attributes):
     return dom.toString()
 
 
+def prewarm_svg(icons, theme=Theme.DARK, indexes=None, **attributes):
+    """ recolor the icons ahead of their first paint
+
+    Parameters
+    ----------
+    icons: Iterable[ChromaIconBase]
+        icons to recolor
+
+    theme: Theme
+        theme of the icons
+
+    indexes: List[int]
+        indexes of the path nodes to recolor, all the nodes if it's `None`
+
+    **attributes:
+        svg attributes of path nodes, e.g. `fill="#858789"`
+    """
+    for icon in icons:
+        write_svg(icon.path(theme), indexes, **attributes)
+
+
+def svg_renderer(icon_path, theme=None, indexes=None, **attributes):
+    """ get the cached renderer of the svg icon recolored with attributes """
+    key = (icon_path, theme, tuple(sorted(attributes.items())),
+           tuple(indexes) if indexes else None)
+    renderer = svg_renderer_cache.get(key)
+    if renderer is None:
+        if attributes:
+            renderer = QSvgRenderer(
+                write_svg(icon_path, indexes, **attributes).encode())
+        else:
+            renderer = QSvgRenderer(icon_path)
+
+        svg_renderer_cache.set(key, renderer)
+
+    return renderer
+
+
+def render_svg(icon_path, painter, rect, theme=None, indexes=None,
+               **attributes):
+    """ render the svg icon recolored with attributes """
+    if vector_icon_bundle.enabled and vector_icon_bundle.render(
+            icon_path, painter, rect, indexes, **attributes):
+        return
+
+    svg_renderer(icon_path, theme, indexes, **attributes).render(
+        painter, QRectF(rect))
+
+
+def device_pixel_ratio(painter):
+    device = painter.device()
+    return device.devicePixelRatioF() if device else 1.0
+
+
+def styled_pixmap(pixmap, mode=QIcon.Normal):
+    """ get the pixmap of the icon mode, e.g. grayed out when disabled """
+    app = QApplication.instance()
+    if mode == QIcon.Normal or not app:
+        return pixmap
+
+    return app.style().generatedIconPixmap(mode, pixmap, QStyleOption())
+
+
+def svg_pixmap_key(icon_path, width, height, ratio=1.0, theme=None,
+                   mode=QIcon.Normal, indexes=None, **attributes):
+    return (icon_path, width, height, ratio, theme, mode,
+            tuple(indexes) if indexes else None,
+            tuple(sorted(attributes.items())) if attributes else None)
+
+
+def svg_pixmap(icon_path, width, height, ratio=1.0, theme=None,
+               mode=QIcon.Normal, indexes=None, **attributes):
+    """ get the cached pixmap of the svg icon
+
+    Parameters
+    ----------
+    icon_path: str
+        path of svg icon
+
+    width, height: int
+        logical size of pixmap
+
+    ratio: float
+        device pixel ratio of pixmap
+
+    theme: Theme
+        theme of icon
+
+    mode: QIcon.Mode
+        icon mode
+
+    indexes: List[int]
+        indexes of the path nodes to recolor
+
+    **attributes:
+        svg attributes of path nodes
+    """
+    key = svg_pixmap_key(icon_path, width, height, ratio, theme, mode,
+                         indexes, **attributes)
+    pixmap = icon_pixmap_cache.get(key)
+    if pixmap is not None:
+        return pixmap
+
+    if icon_pixmap_cache.tint and not indexes and list(attributes) == ['fill']:
+        # tint the mask of the original icon instead of rewriting the svg
+        mask = svg_pixmap(icon_path, width, height, ratio, theme)
+        pixmap = tint_pixmap(mask, attributes['fill'])
+    else:
+        pixmap = QPixmap(round(width * ratio), round(height * ratio))
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHints(QPainter.Antialiasing |
+                               QPainter.SmoothPixmapTransform)
+        render_svg(icon_path, painter, QRectF(pixmap.rect()), theme, indexes,
+                   **attributes)
+        painter.end()
+        pixmap.setDevicePixelRatio(ratio)
+
+    pixmap = styled_pixmap(pixmap, mode)
+    icon_pixmap_cache.set(key, pixmap)
+    return pixmap
+
+
+def tint_pixmap(pixmap, color):
+    """ get a copy of the pixmap filled with color where it's opaque """
+    pixmap = pixmap.copy()
+    painter = QPainter(pixmap)
+    painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    painter.fillRect(pixmap.rect(), QColor(color))
+    painter.end()
+    return pixmap
+
+
+def draw_pixmap(painter, rect, pixmap):
+    """ draw pixmap into the rect, it is only scaled if the sizes differ """
+    x, y, w, h = QRectF(rect).getRect()
+    ratio = pixmap.devicePixelRatio()
+    if pixmap.width() != round(w * ratio) or pixmap.height() != round(h * ratio):
+        painter.drawPixmap(QRectF(x, y, w, h), pixmap, QRectF(pixmap.rect()))
+    elif x.is_integer() and y.is_integer():
+        painter.drawPixmap(int(x), int(y), pixmap)
+    else:
+        painter.drawPixmap(QPointF(x, y), pixmap)
+
+
 def draw_svg_icon(icon, painter, rect):
-    renderer = QSvgRenderer(icon)
+    if isinstance(icon, str):
+        renderer = svg_renderer(icon)
+    else:
+        renderer = QSvgRenderer(icon)
+
     renderer.render(painter, QRectF(rect))
 
 
@@ -45,16 +333,35 @@ class ChromaIconBase(object):
         raise NotImplementedError
 
     def icon(self, theme=Theme.DARK):
+        # a copy shares the data of the cached icon until it's modified
+        return QIcon(qicon_cache.icon(self, theme))
+
+    def create_icon(self, theme=Theme.DARK):
+        """ create a new QIcon of the icon """
+        if icon_atlas.enabled:
+            icon = icon_atlas.icon(self, theme)
+            if icon is not None:
+                return icon
+
         return QIcon(self.path(theme))
 
     def render(self, painter, rect, theme=Theme.DARK, indexes=None,
                **attributes):
-        if attributes:
-            svg = write_svg(self.path(theme), indexes, **attributes).encode()
-        else:
-            svg = self.path(theme)
-
-        draw_svg_icon(svg, painter, rect)
+        if (icon_atlas.enabled and not attributes and not indexes and
+                icon_atlas.draw(self, painter, rect, theme)):
+            return
+
+        if not icon_pixmap_cache.enabled:
+            render_svg(self.path(theme), painter, rect, theme, indexes,
+                       **attributes)
+            return
+
+        pixmap = svg_pixmap(
+            self.path(theme), round(rect.width()), round(rect.height()),
+            device_pixel_ratio(painter), theme, QIcon.Normal, indexes,
+            **attributes
+        )
+        draw_pixmap(painter, rect, pixmap)
 
 
 def to_icon(icon):
@@ -71,9 +378,28 @@ def draw_icon(icon, painter, rect, **attributes):
     if isinstance(icon, ChromaIconBase):
         icon.render(painter, rect, **attributes)
     else:
-        icon = QIcon(icon)
         rect = QRectF(rect).toRect()
-        image = icon.pixmap(rect.width(), rect.height())
+        if not icon_pixmap_cache.enabled:
+            painter.drawPixmap(rect, QIcon(icon).pixmap(rect.size()))
+            return
+
+        # a QIcon built from a pixmap gets a new cache key every time
+        if isinstance(icon, str):
+            source = icon
+        elif isinstance(icon, QPixmap):
+            source = ('pixmap', icon.cacheKey())
+        else:
+            source = QIcon(icon).cacheKey()
+
+        ratio = device_pixel_ratio(painter)
+        key = (source, rect.width(), rect.height(), ratio)
+        image = icon_pixmap_cache.get(key)
+        if image is None:
+            image = QIcon(icon).pixmap(
+                round(rect.width() * ratio), round(rect.height() * ratio))
+            image.setDevicePixelRatio(ratio)
+            icon_pixmap_cache.set(key, image)
+
         painter.drawPixmap(rect, image)
 
 
@@ -182,12 +508,315 @@ class ChromaIcon(ChromaIconBase, Enum):
         )
 
 
+class IconAtlas(object):
+    """ All `ChromaIcon` glyphs rasterized into one image per theme
+
+    Each icon is rasterized at the common sizes for 1x and 2x device pixel
+    ratio, drawing an icon of these sizes only copies a sub rect of the
+    atlas. The atlas is built on first use and saved as a png next to
+    `qconfig.file`, it is rebuilt when an icon file is modified.
+    """
+
+    VERSION = 1
+    SIZES = (12, 14, 16, 20, 24)
+    RATIOS = (1, 2)
+
+    def __init__(self):
+        self.enabled = False
+        self._icons = None
+        self._atlases = {}
+        self._rects = {}
+        self._qicons = {}
+
+    def icons(self):
+        if self._icons is None:
+            self._icons = [
+                i for i in ChromaIcon._member_map_.values()
+                if all(os.path.exists(i.path(t))
+                       for t in Theme._member_map_.values())
+            ]
+            self._layout()
+
+        return self._icons
+
+    def _layout(self):
+        y = 0
+        for ratio in self.RATIOS:
+            for size in self.SIZES:
+                s = size * ratio
+                for x, icon in enumerate(self._icons):
+                    self._rects[(icon, size, ratio)] = QRect(x * s, y, s, s)
+
+                y += s
+
+    def image_size(self):
+        s = max(self.SIZES) * max(self.RATIOS)
+        h = sum(size * ratio for size in self.SIZES for ratio in self.RATIOS)
+        return len(self.icons()) * s, h
+
+    def path(self, theme=Theme.DARK):
+        return os.path.join(os.path.dirname(qconfig.file),
+                            'icon_atlas_{}.png'.format(theme.value.lower()))
+
+    def signature(self, theme=Theme.DARK):
+        """ get the signature of the icon files """
+        paths = [i.path(theme) for i in self.icons()]
+        return '{}-{}-{}-{}'.format(
+            self.VERSION, self.SIZES + self.RATIOS, len(paths),
+            max(os.path.getmtime(i) for i in paths) if paths else 0
+        )
+
+    def _build(self, theme):
+        image = QImage(*self.image_size(), QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHints(QPainter.Antialiasing |
+                               QPainter.SmoothPixmapTransform)
+        for (icon, _, _), rect in self._rects.items():
+            render_svg(icon.path(theme), painter, QRectF(rect), theme)
+
+        painter.end()
+        return image
+
+    def _load(self, theme):
+        path = self.path(theme)
+        signature = self.signature(theme)
+        image = QImage(path)
+        if not image.isNull() and image.text('signature') == signature:
+            return image
+
+        image = self._build(theme)
+        image.setText('signature', signature)
+        try:
+            with atomic_path(path) as tmp:
+                if not image.save(tmp, 'PNG'):
+                    raise IOError('Unable to write ' + tmp)
+        except (IOError, OSError):
+            pass
+
+        return image
+
+    def atlas(self, theme=Theme.DARK):
+        """ get the atlas pixmap of theme, load or build it if it's missing """
+        atlas = self._atlases.get(theme)
+        if atlas is None:
+            self.icons()
+            atlas = self._atlases[theme] = QPixmap.fromImage(self._load(theme))
+
+        return atlas
+
+    def rect(self, icon, size, ratio=1):
+        """ get the rect of icon in the atlas, `None` if it's not included """
+        if self._icons is None:
+            self.icons()
+
+        return self._rects.get((icon, size, ratio))
+
+    def draw(self, icon, painter, rect, theme=Theme.DARK):
+        """ draw the icon from the atlas, return `False` if it's not included """
+        rect = QRectF(rect)
+        size = rect.width()
+        if size != rect.height() or not size.is_integer():
+            return False
+
+        ratio = 2 if device_pixel_ratio(painter) > 1 else 1
+        source = self.rect(icon, int(size), ratio)
+        if source is None:
+            return False
+
+        painter.drawPixmap(rect, self.atlas(theme), QRectF(source))
+        return True
+
+    def icon(self, icon, theme=Theme.DARK):
+        """ get the QIcon of the icon made of its atlas sub images """
+        key = (icon, theme)
+        qicon = self._qicons.get(key)
+        if qicon is not None or self.rect(icon, self.SIZES[0]) is None:
+            return qicon
+
+        qicon = QIcon()
+        atlas = self.atlas(theme)
+        for ratio in self.RATIOS:
+            for size in self.SIZES:
+                pixmap = atlas.copy(self.rect(icon, size, ratio))
+                pixmap.setDevicePixelRatio(ratio)
+                qicon.addPixmap(pixmap)
+
+        self._qicons[key] = qicon
+        return qicon
+
+
+icon_atlas = IconAtlas()
+
+
+def set_icon_atlas_enabled(enabled=True):
+    """ set whether to draw the `ChromaIcon` glyphs from a prebuilt atlas """
+    icon_atlas.enabled = enabled
+    qicon_cache.clear()
+
+
+class IconPrewarmer(QObject):
+    """ Rasterize the registered icons on a worker thread
+
+    Widget modules register the icon variants they paint, `start()` renders
+    them into `QImage`s on a worker thread and hands them over to
+    `icon_pixmap_cache` on the thread of the prewarmer, so the first paint
+    of these icons only draws a cached pixmap.
+    """
+
+    rendered = Signal(object, object)
+    finished = Signal()
+
+    def __init__(self, parent=None):
+        super(IconPrewarmer, self).__init__(parent=parent)
+        self._variants = []
+        self._thread = None
+        self.rendered.connect(self._on_rendered)
+
+    def register(self, icons, size, theme=Theme.DARK, indexes=None,
+                 **attributes):
+        """ register icon variants to prewarm
+
+        Parameters
+        ----------
+        icons: Iterable[ChromaIconBase]
+            icons to prewarm
+
+        size: int | Tuple[int, int]
+            logical size of the painted icons
+
+        theme: Theme
+            theme of the icons
+
+        indexes: List[int]
+            indexes of the path nodes to recolor
+
+        **attributes:
+            svg attributes of path nodes
+        """
+        w, h = (size, size) if isinstance(size, int) else size
+        for icon in icons:
+            self._variants.append(
+                (icon.path(theme), w, h, theme, indexes, attributes))
+
+    def variants(self):
+        return list(self._variants)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, ratios=None):
+        """ start rendering the registered icons
+
+        Parameters
+        ----------
+        ratios: List[float]
+            device pixel ratios to render, default to the ratios of screens
+        """
+        if self.is_running():
+            return
+
+        if ratios is None:
+            app = QApplication.instance()
+            screens = app.screens() if app else []
+            ratios = sorted({i.devicePixelRatio() for i in screens} or {1.0})
+
+        jobs = {}
+        for path, w, h, theme, indexes, attributes in self._variants:
+            for ratio in ratios:
+                key = svg_pixmap_key(path, w, h, ratio, theme, QIcon.Normal,
+                                     indexes, **attributes)
+                if key not in icon_pixmap_cache:
+                    jobs[key] = (path, w, h, ratio, indexes, attributes)
+
+        self._thread = threading.Thread(
+            target=self._render, args=(list(jobs.items()),),
+            name='IconPrewarmer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _render(self, jobs):
+        for key, (path, w, h, ratio, indexes, attributes) in jobs:
+            if attributes:
+                svg = _write_svg(path, indexes, **attributes).encode()
+            else:
+                svg = path
+
+            image = QImage(round(w * ratio), round(h * ratio),
+                           QImage.Format_ARGB32_Premultiplied)
+            image.fill(Qt.transparent)
+            painter = QPainter(image)
+            painter.setRenderHints(QPainter.Antialiasing |
+                                   QPainter.SmoothPixmapTransform)
+            QSvgRenderer(svg).render(painter, QRectF(image.rect()))
+            painter.end()
+
+            image.setDevicePixelRatio(ratio)
+            self.rendered.emit(key, image)
+
+        self.finished.emit()
+
+    def _on_rendered(self, key, image):
+        if key not in icon_pixmap_cache:
+            icon_pixmap_cache.set(key, QPixmap.fromImage(image))
+
+
+icon_prewarmer = IconPrewarmer()
+
+
+def register_icon_prewarm(icons, size, theme=Theme.DARK, indexes=None,
+                          **attributes):
+    """ register icon variants to rasterize by `prewarm_icons()` """
+    icon_prewarmer.register(icons, size, theme, indexes, **attributes)
+
+
+def prewarm_icons(ratios=None):
+    """ rasterize the registered icon variants on a worker thread """
+    icon_prewarmer.start(ratios)
+
+
 class Icon(QIcon):
-    def __init__(self, icon):
-        super().__init__(icon.path())
+    def __init__(self, icon, qicon=None):
+        super().__init__(icon.path() if qicon is None else qicon)
         self.chroma_icon = icon
 
 
+class QIconCache(object):
+    """ Shared QIcons of the icons, rebuilt when the theme changes
+
+    The returned icons are shared and must not be modified, the public
+    getters return copies of them.
+    """
+
+    def __init__(self):
+        self._icons = {}
+        self._wrappers = {}
+
+    def icon(self, icon, theme=Theme.DARK):
+        """ get the QIcon of icon """
+        key = (icon, theme)
+        qicon = self._icons.get(key)
+        if qicon is None:
+            qicon = self._icons[key] = icon.create_icon(theme)
+
+        return qicon
+
+    def wrapper(self, icon):
+        """ get the `Icon` wrapper of icon """
+        qicon = self._wrappers.get(icon)
+        if qicon is None:
+            qicon = self._wrappers[icon] = Icon(icon)
+
+        return qicon
+
+    def clear(self, *args):
+        self._icons.clear()
+        self._wrappers.clear()
+
+
+qicon_cache = QIconCache()
+
+
 class MenuIconEngine(QIconEngine):
 
     def __init__(self, icon):
@@ -205,7 +834,7 @@ class MenuIconEngine(QIconEngine):
         # change icon color according to the theme
         icon = self.icon
         if isinstance(self.icon, Icon):
-            icon = self.icon.chroma_icon.icon()
+            icon = qicon_cache.icon(self.icon.chroma_icon)
 
         # prevent the left side of the icon from being cropped
         rect.adjust(-1, 0, 0, 0)
@@ -226,7 +855,8 @@ class Action(QAction):
 
     def icon(self):
         if self.chroma_icon:
-            return Icon(self.chroma_icon)
+            wrapper = qicon_cache.wrapper(self.chroma_icon)
+            return Icon(self.chroma_icon, wrapper)
 
         return super(Action, self).icon()
 
@@ -236,3 +866,8 @@ class Action(QAction):
             icon = icon.icon()
 
         super(Action, self).setIcon(icon)
+
+
+qconfig.theme_changed.connect(svg_renderer_cache.clear)
+qconfig.theme_changed.connect(icon_pixmap_cache.clear)
+qconfig.theme_changed.connect(qicon_cache.clear)
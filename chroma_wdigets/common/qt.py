@@ -7,9 +7,21 @@ import contextlib
 from Qt import QtWidgets
 from Qt import QtCore
 
+from chroma_wdigets.common.icon import icon_prewarmer
+
 
 @contextlib.contextmanager
-def application(enabled_dpi=True, *args):
+def application(enabled_dpi=True, *args, prewarm_icons=False):
+    """ create the application if there is none
+
+    Parameters
+    ----------
+    enabled_dpi: bool
+        whether to enable high dpi scaling
+
+    prewarm_icons: bool
+        whether to rasterize the icons of widgets on a worker thread
+    """
     app = QtWidgets.QApplication.instance()
     if not app:
         if enabled_dpi:
@@ -21,7 +33,13 @@ def application(enabled_dpi=True, *args):
                 QtCore.Qt.AA_UseHighDpiPixmaps)
 
         app = QtWidgets.QApplication(list(args))
+        if prewarm_icons:
+            icon_prewarmer.start()
+
         yield app
         app.exec_()
     else:
+        if prewarm_icons:
+            icon_prewarmer.start()
+
         yield app
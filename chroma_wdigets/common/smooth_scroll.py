@@ -6,6 +6,8 @@ from Qt import QtCore
 from Qt import QtGui
 from Qt import QtWidgets
 
+from chroma_wdigets.common.animation import animation_ticker
+
 
 class SmoothMode(Enum):
     """ Smooth mode """
@@ -39,9 +41,8 @@ class SmoothScroll(object):
         self.last_wheel_event = None
         self.scroll_stamps = deque()
         self.steps_left_queue = deque()
-        self.smooth_move_timer = QtCore.QTimer(widget)
+        self.next_step_time = 0
         self.smooth_mode = SmoothMode(SmoothMode.LINEAR)
-        self.smooth_move_timer.timeout.connect(self._smooth_move)
 
     def set_smooth_mode(self, smoothMode):
         """ set smooth mode """
@@ -76,8 +77,15 @@ class SmoothScroll(object):
         # form a list of moving distances and steps, and insert it into the queue for processing.
         self.steps_left_queue.append([delta, self.steps_total])
 
-        # overflow time of timer: 1000ms/frames
-        self.smooth_move_timer.start(int(1000 / self.fps))
+        # move one step every 1000ms/frames on the frames of the ticker
+        self.next_step_time = animation_ticker.time() + 1000 / self.fps
+        animation_ticker.register(self._on_tick)
+
+    def _on_tick(self, now):
+        """ move the steps due at the time of the frame """
+        while self.steps_left_queue and now >= self.next_step_time:
+            self.next_step_time += 1000 / self.fps
+            self._smooth_move()
 
     def _smooth_move(self):
         """ scroll smoothly when timer time out """
@@ -117,7 +125,7 @@ class SmoothScroll(object):
 
         # stop scrolling if the queque is empty
         if not self.steps_left_queue:
-            self.smooth_move_timer.stop()
+            animation_ticker.unregister(self._on_tick)
 
     def _sub_delta(self, delta, stepsLeft):
         """ get the interpolation for each step """
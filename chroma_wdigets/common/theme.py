@@ -2,49 +2,231 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
+import re
+import time
+import json
 import codecs
 import weakref
+from collections import OrderedDict
 from string import Template
 from enum import Enum
 
+from Qt import QtCore
 from Qt import QtGui
+from Qt import QtWidgets
 
 from chroma_wdigets.common.config import (
     Theme,
     qconfig,
-    is_dark_theme,
     RESOURCES_PATH,
-    DARK_BACKGROUND_COLOR
+    DARK_BACKGROUND_COLOR,
+    atomic_path
 )
 
 
-class StyleSheetManager(object):
+class StyleSheetManager(QtCore.QObject):
+    """ Style sheet manager
+
+    When `lazy` is enabled, hidden widgets are only marked stale on theme
+    change and restyled when they receive their next `Show`/`Polish` event.
+    """
+
     def __init__(self):
+        super(StyleSheetManager, self).__init__()
+        self.lazy = True
         self._widgets = weakref.WeakKeyDictionary()
+        self._groups = {}
+        self._stale = weakref.WeakSet()
 
     def register(self, style_sheet_obj, widget):
-        if widget not in self._widgets:
+        old = self._widgets.get(widget)
+        if old is None:
             widget.destroyed.connect(self.deregister)
+        elif old is not style_sheet_obj:
+            self._discard_from_group(old, widget)
 
         self._widgets[widget] = style_sheet_obj
+        self._groups.setdefault(style_sheet_obj, weakref.WeakSet()).add(widget)
 
     def deregister(self, widget):
+        self._stale.discard(widget)
         if widget not in self._widgets:
             return
 
-        self._widgets.pop(widget)
+        self._discard_from_group(self._widgets.pop(widget), widget)
+
+    def _discard_from_group(self, style_sheet_obj, widget):
+        group = self._groups.get(style_sheet_obj)
+        if group is None:
+            return
+
+        group.discard(widget)
+        if not group:
+            self._groups.pop(style_sheet_obj)
 
     def items(self):
         return self._widgets.items()
 
+    def groups(self, root=None):
+        """ get the registered widgets grouped by style sheet
+
+        Parameters
+        ----------
+        root: QWidget
+            only get the registered widgets of this widget subtree
+        """
+        if root is None:
+            return [(style_sheet_obj, list(group))
+                    for style_sheet_obj, group in list(self._groups.items())]
+
+        groups = {}
+        for widget in [root] + root.findChildren(QtWidgets.QWidget):
+            style_sheet_obj = self._widgets.get(widget)
+            if style_sheet_obj is not None:
+                groups.setdefault(style_sheet_obj, []).append(widget)
+
+        return list(groups.items())
+
+    def counts(self):
+        """ get the number of registered widgets of each style sheet """
+        return {style_sheet_obj: len(group)
+                for style_sheet_obj, group in self._groups.items()}
+
+    def mark_stale(self, widget):
+        """ defer restyling the widget until it is shown """
+        if widget in self._stale:
+            return
+
+        self._stale.add(widget)
+        widget.installEventFilter(self)
+
+    def mark_fresh(self, widget):
+        if widget not in self._stale:
+            return
+
+        self._stale.discard(widget)
+        widget.removeEventFilter(self)
+
+    def is_stale(self, widget):
+        return widget in self._stale
+
+    def eventFilter(self, obj, e):
+        if (e.type() in (QtCore.QEvent.Show, QtCore.QEvent.Polish) and
+                obj in self._stale):
+            self.mark_fresh(obj)
+            set_style_sheet(obj, self._widgets[obj], qconfig.theme, False)
+
+        return super(StyleSheetManager, self).eventFilter(obj, e)
+
 
 style_sheet_manager = StyleSheetManager()
 
 
+class StyleSheetCache(object):
+    """ Process-wide cache of compiled style sheets """
+
+    def __init__(self):
+        self._sheets = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        qss = self._sheets.get(key)
+        if qss is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return qss
+
+    def set(self, key, qss):
+        self._sheets[key] = qss
+
+    def clear(self):
+        self._sheets.clear()
+
+    def stats(self):
+        """ Return the hit/miss counters and the number of cached sheets """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._sheets)
+        }
+
+
+style_sheet_cache = StyleSheetCache()
+
+
 class QssTemplate(Template):
     delimiter = '--'
 
 
+class CompiledQss(object):
+    """ QSS template tokenized into static segments and variable slots
+
+    Rendering only joins the segments with the resolved values, it gives the
+    same result as `QssTemplate.safe_substitute`.
+    """
+
+    def __init__(self, qss):
+        self.segments = []
+        self.slots = []
+
+        pos = 0
+        literal = []
+        for m in QssTemplate.pattern.finditer(qss):
+            literal.append(qss[pos:m.start()])
+            name = m.group('named') or m.group('braced')
+            if m.group('escaped') is not None:
+                literal.append(QssTemplate.delimiter)
+            elif name is not None:
+                self.segments.append(''.join(literal))
+                self.slots.append((name, m.group()))
+                literal = []
+            else:
+                literal.append(m.group())
+
+            pos = m.end()
+
+        literal.append(qss[pos:])
+        self.segments.append(''.join(literal))
+
+    def variables(self):
+        return {name for name, _ in self.slots}
+
+    def render(self, mapping):
+        parts = [self.segments[0]]
+        for (name, text), segment in zip(self.slots, self.segments[1:]):
+            parts.append(mapping.get(name, text))
+            parts.append(segment)
+
+        return ''.join(parts)
+
+
+class QssTemplateCache(object):
+    """ Compiled QSS templates of the style sheet files """
+
+    def __init__(self):
+        self._templates = {}
+
+    def get(self, path):
+        template = self._templates.get(path)
+        if template is None:
+            with codecs.open(path, encoding='utf-8') as f:
+                template = CompiledQss(f.read())
+
+            self._templates[path] = template
+
+        return template
+
+    def clear(self):
+        self._templates.clear()
+
+
+qss_template_cache = QssTemplateCache()
+
+
 class ThemeColor(Enum):
     PRIMARY = "ThemeColorPrimary"
     DARK_1 = "ThemeColorDark1"
@@ -56,51 +238,226 @@ class ThemeColor(Enum):
     LIGHT_3 = "ThemeColorLight3"
 
     def name(self):
-        return self.color().name()
+        return theme_palette.name(self)
 
     def color(self):
-        color = qconfig.get(qconfig.theme_color)
-        # transform color into hsv space
-        h, s, v, _ = color.getHsvF()
-
-        if is_dark_theme():
-            s *= 0.73
-            v = 0.73
-            if self == self.DARK_1:
-                v *= 0.9
-            elif self == self.DARK_2:
-                s *= 0.977
-                v *= 0.82
-            elif self == self.DARK_3:
-                s *= 0.95
-                v *= 0.7
-            elif self == self.LIGHT_1:
-                s *= 0.92
-            elif self == self.LIGHT_2:
-                s *= 0.78
-            elif self == self.LIGHT_3:
-                s *= 0.65
-            elif self == self.DARK_BACKGROUND:
-                return QtGui.QColor(DARK_BACKGROUND_COLOR)
-        else:
-            if self == self.DARK_1:
-                v *= 0.75
-            elif self == self.DARK_2:
-                s *= 1.05
-                v *= 0.5
-            elif self == self.DARK_3:
-                s *= 1.1
-                v *= 0.4
-            elif self == self.LIGHT_1:
-                v *= 1.05
-            elif self == self.LIGHT_2:
-                s *= 0.75
-                v *= 1.05
-            elif self == self.LIGHT_3:
-                s *= 0.65
-                v *= 1.05
-
-        return QtGui.QColor.fromHsvF(h, min(s, 1), min(v, 1))
+        return QtGui.QColor(theme_palette.color(self))
+
+    def brush(self):
+        return theme_palette.brush(self)
+
+
+def derive_theme_color(theme_color, color, dark=True):
+    """ derive a theme color variant from the accent color """
+    # transform color into hsv space
+    h, s, v, _ = color.getHsvF()
+
+    if dark:
+        s *= 0.73
+        v = 0.73
+        if theme_color == ThemeColor.DARK_1:
+            v *= 0.9
+        elif theme_color == ThemeColor.DARK_2:
+            s *= 0.977
+            v *= 0.82
+        elif theme_color == ThemeColor.DARK_3:
+            s *= 0.95
+            v *= 0.7
+        elif theme_color == ThemeColor.LIGHT_1:
+            s *= 0.92
+        elif theme_color == ThemeColor.LIGHT_2:
+            s *= 0.78
+        elif theme_color == ThemeColor.LIGHT_3:
+            s *= 0.65
+        elif theme_color == ThemeColor.DARK_BACKGROUND:
+            return QtGui.QColor(DARK_BACKGROUND_COLOR)
+    else:
+        if theme_color == ThemeColor.DARK_1:
+            v *= 0.75
+        elif theme_color == ThemeColor.DARK_2:
+            s *= 1.05
+            v *= 0.5
+        elif theme_color == ThemeColor.DARK_3:
+            s *= 1.1
+            v *= 0.4
+        elif theme_color == ThemeColor.LIGHT_1:
+            v *= 1.05
+        elif theme_color == ThemeColor.LIGHT_2:
+            s *= 0.75
+            v *= 1.05
+        elif theme_color == ThemeColor.LIGHT_3:
+            s *= 0.65
+            v *= 1.05
+
+    return QtGui.QColor.fromHsvF(h, min(s, 1), min(v, 1))
+
+
+class ThemePalette(object):
+    """ All theme color variants of a theme and accent color
+
+    The variants are derived once and shared, so the returned `QColor` and
+    `QBrush` instances must not be modified.
+
+    Parameters
+    ----------
+    theme: Theme
+        theme mode, follow the global theme if it's `None`
+
+    color: QColor
+        accent color, follow the global theme color if it's `None`
+    """
+
+    def __init__(self, theme=None, color=None):
+        self._theme = theme
+        self._accent_color = color
+        self._colors = {}
+        self._brushes = {}
+        self._names = {}
+        self._mappings = {}
+
+    def theme(self):
+        return self._theme or qconfig.theme
+
+    def accent_color(self):
+        if self._accent_color is None:
+            return qconfig.get(qconfig.theme_color)
+
+        return self._accent_color
+
+    def set_theme(self, theme):
+        """ pin the theme mode, follow the global theme if it's `None` """
+        self._theme = theme
+        self.invalidate()
+
+    def set_accent_color(self, color):
+        """ pin the accent color, follow the global theme color if it's
+        `None` """
+        self._accent_color = None if color is None else QtGui.QColor(color)
+        self.invalidate()
+
+    def rebuild(self):
+        dark = self.theme() == Theme.DARK
+        accent = self.accent_color()
+        for c in ThemeColor._member_map_.values():
+            color = derive_theme_color(c, accent, dark)
+            self._colors[c] = color
+            self._brushes[c] = QtGui.QBrush(color)
+            self._names[c] = color.name()
+            self._mappings[c.value] = color.name()
+
+    def invalidate(self, *args):
+        self._colors.clear()
+        self._brushes.clear()
+        self._names.clear()
+        self._mappings.clear()
+
+    def color(self, theme_color=ThemeColor.PRIMARY):
+        if not self._colors:
+            self.rebuild()
+
+        return self._colors[theme_color]
+
+    def brush(self, theme_color=ThemeColor.PRIMARY):
+        if not self._brushes:
+            self.rebuild()
+
+        return self._brushes[theme_color]
+
+    def name(self, theme_color=ThemeColor.PRIMARY):
+        if not self._names:
+            self.rebuild()
+
+        return self._names[theme_color]
+
+    def mappings(self):
+        """ get the QSS variable mappings of theme colors """
+        if not self._mappings:
+            self.rebuild()
+
+        return self._mappings
+
+
+theme_palette = ThemePalette()
+
+
+class ThemeScopeManager(object):
+    """ Theme scopes of windows and containers
+
+    A scope overrides the theme and/or the accent color of a widget subtree,
+    widgets resolve their palette from the nearest scoped ancestor and fall
+    back to the global `theme_palette`.
+    """
+
+    def __init__(self):
+        self._palettes = weakref.WeakKeyDictionary()
+        self._styled = weakref.WeakSet()
+
+    def __bool__(self):
+        return bool(self._palettes)
+
+    __nonzero__ = __bool__
+
+    def _scope_palette(self, widget):
+        palette = self._palettes.get(widget)
+        if palette is None:
+            palette = self._palettes[widget] = ThemePalette()
+            widget.destroyed.connect(self.remove_scope)
+
+        return palette
+
+    def set_theme(self, widget, theme):
+        self._scope_palette(widget).set_theme(theme)
+
+    def set_theme_color(self, widget, color):
+        self._scope_palette(widget).set_accent_color(color)
+
+    def remove_scope(self, widget):
+        self._palettes.pop(widget, None)
+
+    def mark_styled(self, widget):
+        """ mark the scoped widget as styled by its own style sheet while
+        the application style sheet is enabled """
+        self._styled.add(widget)
+
+    def is_styled(self, widget):
+        return widget in self._styled
+
+    def take_styled(self, widget):
+        """ unmark the widget, return whether it was marked """
+        if widget not in self._styled:
+            return False
+
+        self._styled.discard(widget)
+        return True
+
+    def scope(self, widget):
+        """ get the nearest scoped ancestor of widget, including itself """
+        while widget is not None:
+            if widget in self._palettes:
+                return widget
+
+            widget = widget.parentWidget()
+
+        return None
+
+    def palette(self, widget=None):
+        """ get the palette of widget """
+        if widget is None or not self._palettes:
+            return theme_palette
+
+        try:
+            scope = self.scope(widget)
+        except RuntimeError:
+            return theme_palette
+
+        return theme_palette if scope is None else self._palettes[scope]
+
+    def invalidate(self, *args):
+        for palette in list(self._palettes.values()):
+            palette.invalidate()
+
+
+theme_scope_manager = ThemeScopeManager()
 
 
 class ThemePath(Enum):
@@ -113,29 +470,212 @@ class ThemePath(Enum):
         return path_by_name[self.value]
 
 
-def apply_theme_color(qss):
-    template = QssTemplate(qss)
-    color_mappings = {c.value: c.name() for c in
-                      ThemeColor._member_map_.values()}
-    path_mappings = {p.value: p.path() for p in
-                     ThemePath._member_map_.values()}
-    return template.safe_substitute({**color_mappings, **path_mappings})
+def theme_mappings(palette=None):
+    """ get the QSS variable mappings of theme colors and paths """
+    palette = palette or theme_palette
+    mappings = {p.value: p.path() for p in ThemePath._member_map_.values()}
+    mappings.update(palette.mappings())
+    return mappings
+
+
+def apply_theme_color(qss, palette=None):
+    if not isinstance(qss, CompiledQss):
+        qss = CompiledQss(qss)
+
+    return qss.render(theme_mappings(palette))
+
+
+def compile_style_sheet(style_sheet_obj, theme=Theme.DARK, palette=None):
+    """ read the style sheet file and substitute the theme colors """
+    template = qss_template_cache.get(style_sheet_obj.path(theme))
+    return apply_theme_color(template, palette)
+
+
+class QssBundleCache(object):
+    """ On-disk cache of the substituted style sheets
+
+    All the `ChromaStyleSheet` files compiled with the same theme and accent
+    color are stored as one bundle next to `qconfig.file`, so later launches
+    load one pre-baked file instead of reading and substituting every file.
+    The cache is dropped when a style sheet file is modified.
+
+    Only the bundle of the global theme and accent color is saved, `delay`
+    milliseconds after the last miss and not while a theme color preview is
+    active, so temporary colors never compile bundles or write the file.
+    """
+
+    VERSION = 1
+    MAX_BUNDLES = 8
+
+    def __init__(self, delay=1000):
+        self.enabled = False
+        self.delay = delay
+        self._data = None
+        self._timer = None
+
+    def path(self):
+        return os.path.join(os.path.dirname(qconfig.file), 'qss_cache.json')
+
+    @staticmethod
+    def signature():
+        """ get the signature of the style sheet files, the compiled style
+        sheets embed the absolute resource path so it's part of it """
+        mtimes = []
+        for folder, _, files in os.walk(os.path.join(RESOURCES_PATH, 'qss')):
+            mtimes.extend(os.path.getmtime(os.path.join(folder, i))
+                          for i in files if i.endswith('.qss'))
+
+        return '{}-{}-{}'.format(
+            RESOURCES_PATH, len(mtimes), max(mtimes or [0]))
+
+    def _load(self):
+        self._data = {
+            'version': self.VERSION,
+            'signature': self.signature(),
+            'bundles': {}
+        }
+
+        try:
+            with codecs.open(self.path(), encoding='utf-8') as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+
+        if (data.get('version') == self.VERSION and
+                data.get('signature') == self._data['signature']):
+            self._data['bundles'] = data.get('bundles', {})
+
+    def _save(self):
+        try:
+            with atomic_path(self.path()) as tmp:
+                with codecs.open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, ensure_ascii=False)
+        except (IOError, OSError):
+            pass
+
+    def bundle(self, palette):
+        """ get the bundle of palette, build and save it if it's missing """
+        if self._data is None:
+            self._load()
+
+        key = self.key(palette)
+        bundles = self._data['bundles']
+        if key in bundles:
+            return bundles[key]
+
+        bundle = {}
+        for style_sheet in ChromaStyleSheet._member_map_.values():
+            for theme in Theme._member_map_.values():
+                if os.path.exists(style_sheet.path(theme)):
+                    bundle[theme.value + '/' + style_sheet.value] = \
+                        compile_style_sheet(style_sheet, theme, palette)
+
+        while len(bundles) >= self.MAX_BUNDLES:
+            bundles.pop(next(iter(bundles)))
 
+        bundles[key] = bundle
+        self._save()
+        return bundle
 
-def get_style_sheet(style_sheet_obj, theme=Theme.DARK):
-    file_path = style_sheet_obj.path(theme)
+    @staticmethod
+    def key(palette):
+        color = palette.accent_color().name(QtGui.QColor.HexArgb)
+        return '{}|{}'.format(palette.theme().value, color)
 
-    with codecs.open(file_path, encoding='utf-8') as f:
-        qss = f.read()
+    def get(self, style_sheet_obj, theme=Theme.DARK, palette=None):
+        """ get the compiled style sheet of a saved bundle, `None` if it's
+        missing """
+        palette = palette or theme_palette
+        if self._data is None:
+            self._load()
 
-    return apply_theme_color(qss)
+        bundle = self._data['bundles'].get(self.key(palette))
+        if bundle is None:
+            if palette is theme_palette:
+                self.schedule()
+
+            return None
+
+        return bundle.get(theme.value + '/' + style_sheet_obj.value)
+
+    def schedule(self):
+        """ save the bundle of the global palette after `delay` milliseconds
+        without another miss """
+        if not QtCore.QCoreApplication.instance():
+            self._store()
+            return
+
+        if self._timer is None:
+            self._timer = QtCore.QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self._store)
+
+        self._timer.start(self.delay)
+
+    def _store(self):
+        if theme_color_preview.is_active():
+            self.schedule()
+            return
+
+        self.bundle(theme_palette)
+
+
+qss_bundle_cache = QssBundleCache()
+
+
+def set_qss_bundle_cache_enabled(enabled=True):
+    """ set whether to cache the compiled style sheets on disk """
+    qss_bundle_cache.enabled = enabled
+
+
+def get_style_sheet(style_sheet_obj, theme=Theme.DARK, palette=None):
+    # the substituted colors also depend on the palette theme and accent color
+    palette = palette or theme_palette
+    key = (style_sheet_obj, theme, palette.theme(),
+           palette.accent_color().rgba())
+    qss = style_sheet_cache.get(key)
+    if qss is not None:
+        return qss
+
+    if qss_bundle_cache.enabled and isinstance(style_sheet_obj, ChromaStyleSheet):
+        qss = qss_bundle_cache.get(style_sheet_obj, theme, palette)
+
+    if qss is None:
+        qss = compile_style_sheet(style_sheet_obj, theme, palette)
+
+    style_sheet_cache.set(key, qss)
+    return qss
 
 
 def set_style_sheet(widget, style_sheet_obj, theme=Theme.DARK, register=True):
+    # scoped widgets always use the theme of their scope
+    palette = theme_scope_manager.palette(widget)
+    if palette is not theme_palette:
+        theme = palette.theme()
+    elif app_style_sheet.enabled and isinstance(style_sheet_obj, ChromaStyleSheet):
+        # the application style sheet only needs the widget to be tagged
+        widget.setProperty(AppStyleSheet.PROPERTY, style_sheet_obj.value)
+        if theme_scope_manager.take_styled(widget):
+            widget.setStyleSheet('')
+
+        if app_style_sheet.dual_theme:
+            app_style_sheet.set_widget_theme(
+                widget, style_sheet_obj, qconfig.theme, register)
+        elif register:
+            style_sheet_manager.register(style_sheet_obj, widget)
+
+        return
+
     if register:
         style_sheet_manager.register(style_sheet_obj, widget)
 
-    widget.setStyleSheet(get_style_sheet(style_sheet_obj, theme))
+    if palette is not theme_palette and app_style_sheet.enabled:
+        # keep the application style sheet from mixing into the scope
+        widget.setProperty(AppStyleSheet.PROPERTY, None)
+        theme_scope_manager.mark_styled(widget)
+
+    style_sheet_manager.mark_fresh(widget)
+    widget.setStyleSheet(get_style_sheet(style_sheet_obj, theme, palette))
 
 
 class StyleSheetBase(object):
@@ -180,30 +720,485 @@ class ChromaStyleSheet(StyleSheetBase, Enum):
             RESOURCES_PATH, theme.value.lower(), self.value)
 
 
-def update_style_sheet():
-    """ update the style sheet of all fluent widgets """
-    removes = []
-    for widget, file in style_sheet_manager.items():
+class AppStyleSheet(object):
+    """ Single application-wide style sheet
+
+    All `ChromaStyleSheet` files of the active theme are merged into one style
+    sheet installed on `QApplication`. The rules of each file are scoped to
+    the widgets tagged with its name, so `ChromaStyleSheet.X.apply(widget)`
+    only sets a dynamic property instead of a per-widget style sheet.
+
+    In dual theme mode the light and dark files are merged together and
+    scoped by a `chromaTheme` property as well, switching theme only flips
+    that property and repolishes the registered widgets.
+    """
+
+    PROPERTY = 'chromaStyleSheet'
+    THEME_PROPERTY = 'chromaTheme'
+
+    _comment_re = re.compile(r'/\*.*?\*/', re.S)
+    _combinator_re = re.compile(r'\s*>\s*|\s+')
+
+    def __init__(self):
+        self.enabled = False
+        self.dual_theme = False
+        self._dual_theme_style_sheet = None
+        self._installed = None
+
+    @classmethod
+    def scope_selector(cls, selector, attribute):
+        """ restrict the selector to the widgets matching `attribute` and
+        their children """
+        selector = selector.strip()
+        m = cls._combinator_re.search(selector)
+        first, rest = (selector[:m.start()], selector[m.start():]) if m else (
+            selector, '')
+
+        # attribute selectors must precede pseudo states and sub controls
+        i = first.find(':')
+        first = first + attribute if i < 0 else (
+            first[:i] + attribute + first[i:])
+        return '{}{}, *{} {}'.format(first, rest, attribute, selector)
+
+    @classmethod
+    def scope(cls, qss, attribute):
+        """ scope every rule of the style sheet with `attribute` """
+        rules = []
+        for block in cls._comment_re.sub('', qss).split('}'):
+            if '{' not in block:
+                continue
+
+            selectors, body = block.split('{', 1)
+            selectors = ', '.join(cls.scope_selector(i, attribute)
+                                  for i in selectors.split(',') if i.strip())
+            rules.append('%s {%s}' % (selectors, body))
+
+        return '\n'.join(rules)
+
+    def _merge(self, theme, palette=None, scope_theme=False):
+        sheets = []
+        for style_sheet in ChromaStyleSheet._member_map_.values():
+            if not os.path.exists(style_sheet.path(theme)):
+                continue
+
+            attribute = '[{}="{}"]'.format(self.PROPERTY, style_sheet.value)
+            if scope_theme:
+                attribute += '[{}="{}"]'.format(self.THEME_PROPERTY, theme.value)
+
+            qss = get_style_sheet(style_sheet, theme, palette)
+            sheets.append(self.scope(qss, attribute))
+
+        return '\n'.join(sheets)
+
+    def style_sheet(self, theme=Theme.DARK):
+        """ get the merged style sheet of all the style sheet files """
+        if self.dual_theme:
+            return self.dual_theme_style_sheet()
+
+        key = (AppStyleSheet, theme, qconfig.theme,
+               qconfig.get(qconfig.theme_color).rgba())
+        qss = style_sheet_cache.get(key)
+        if qss is None:
+            qss = self._merge(theme)
+            style_sheet_cache.set(key, qss)
+
+        return qss
+
+    def dual_theme_style_sheet(self):
+        """ get the merged style sheet of both light and dark theme, it only
+        has to be rebuilt when the theme color changes """
+        accent = qconfig.get(qconfig.theme_color)
+        if self._dual_theme_style_sheet:
+            rgba, qss = self._dual_theme_style_sheet
+            if rgba == accent.rgba():
+                return qss
+
+        qss = '\n'.join(
+            self._merge(t, ThemePalette(t, accent), True)
+            for t in Theme._member_map_.values()
+        )
+        self._dual_theme_style_sheet = (accent.rgba(), qss)
+        return qss
+
+    def set_widget_theme(self, widget, style_sheet_obj, theme, register=True):
+        """ flip the theme property of widget and repolish it """
+        if register:
+            style_sheet_manager.register(style_sheet_obj, widget)
+
+        style_sheet_manager.mark_fresh(widget)
+        if widget.property(self.THEME_PROPERTY) == theme.value:
+            return
+
+        widget.setProperty(self.THEME_PROPERTY, theme.value)
+        if not widget.testAttribute(QtCore.Qt.WA_WState_Polished):
+            return
+
+        for w in [widget] + widget.findChildren(QtWidgets.QWidget):
+            w.style().unpolish(w)
+            w.style().polish(w)
+
+        QtWidgets.QWidget.update(widget)
+
+    def apply(self):
+        app = QtWidgets.QApplication.instance()
+        if not app:
+            return
+
+        qss = self.style_sheet(qconfig.theme)
+        if qss is not self._installed:
+            app.setStyleSheet(qss)
+            self._installed = qss
+
+
+app_style_sheet = AppStyleSheet()
+
+
+def set_app_style_sheet_enabled(enabled=True, dual_theme=False):
+    """ set whether to use a single application-wide style sheet
+
+    It should be enabled before any widget is created, the widgets created
+    before are switched to the application style sheet as well.
+
+    Parameters
+    ----------
+    enabled: bool
+        whether to enable the application style sheet
+
+    dual_theme: bool
+        whether to merge the style sheets of both themes, so that switching
+        theme does not reparse the style sheet
+    """
+    app_style_sheet.enabled = enabled
+    app_style_sheet.dual_theme = dual_theme
+    app_style_sheet._installed = None
+    app = QtWidgets.QApplication.instance()
+
+    if not enabled:
+        if app:
+            app.setStyleSheet('')
+
+        update_style_sheet(lazy=False)
+        return
+
+    for widget, style_sheet in list(style_sheet_manager.items()):
+        if isinstance(style_sheet, ChromaStyleSheet):
+            style_sheet_manager.deregister(widget)
+            widget.setStyleSheet('')
+            set_style_sheet(widget, style_sheet)
+
+    app_style_sheet.apply()
+
+
+class StyleSheetScheduler(QtCore.QObject):
+    """ Restyle widgets visible ones first, the rest in time-sliced batches
+
+    Visible widgets are restyled in the same tick. Hidden ones are left to
+    the lazy restyle of `style_sheet_manager`, or if it is disabled,
+    restyled across later event loop iterations, spending at most
+    `frame_budget` milliseconds per iteration. A restyle of some groups is
+    merged into the pending queue, the latest style sheet of a widget wins.
+    `finished` reports the total restyle time in milliseconds.
+    """
+
+    finished = QtCore.Signal(float)
+
+    def __init__(self, frame_budget=8, parent=None):
+        super(StyleSheetScheduler, self).__init__(parent=parent)
+        self.frame_budget = frame_budget
+        self.elapsed = 0
+        self._queue = OrderedDict()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._restyle_batch)
+
+    def is_running(self):
+        return bool(self._queue)
+
+    def restyle(self, groups, lazy=True):
+        """ restyle the `(style_sheet, widgets)` groups """
+        self._timer.stop()
+        if not self._queue:
+            self.elapsed = 0
+
+        t = time.perf_counter()
+        scopes = theme_scope_manager
+        for style_sheet, widgets in groups:
+            # each style sheet is computed once per palette of the group
+            app = (app_style_sheet.enabled and
+                   isinstance(style_sheet, ChromaStyleSheet))
+            sheets = {}
+            for widget in widgets:
+                try:
+                    visible = widget.isVisible()
+                    palette = scopes.palette(widget)
+                except RuntimeError:
+                    style_sheet_manager.deregister(widget)
+                    continue
+
+                qss = None
+                if not app or palette is not theme_palette:
+                    qss = sheets.get(palette)
+                    if qss is None:
+                        qss = sheets[palette] = get_style_sheet(
+                            style_sheet, palette.theme(), palette)
+                elif not (app_style_sheet.dual_theme or
+                          scopes.is_styled(widget)):
+                    # the application style sheet already restyles it
+                    continue
+
+                if visible or lazy and style_sheet_manager.lazy:
+                    self._queue.pop(widget, None)
+
+                if visible:
+                    self._apply(widget, style_sheet, qss)
+                elif lazy and style_sheet_manager.lazy:
+                    style_sheet_manager.mark_stale(widget)
+                else:
+                    self._queue[widget] = (style_sheet, qss)
+
+        self.elapsed += (time.perf_counter() - t) * 1000
+
+        if lazy and self.frame_budget and QtCore.QCoreApplication.instance():
+            if self._queue:
+                self._timer.start()
+                return
+        else:
+            self._restyle_batch(budget=None)
+            return
+
+        self.finished.emit(self.elapsed)
+
+    def _apply(self, widget, style_sheet, qss=None):
         try:
-            set_style_sheet(widget, file, qconfig.theme)
+            if qss is None or app_style_sheet.enabled:
+                set_style_sheet(widget, style_sheet, qconfig.theme, False)
+            else:
+                style_sheet_manager.mark_fresh(widget)
+                widget.setStyleSheet(qss)
         except RuntimeError:
-            removes.append(widget)
+            style_sheet_manager.deregister(widget)
+
+    def _restyle_batch(self, budget=-1):
+        if budget == -1:
+            budget = self.frame_budget
+
+        t = time.perf_counter()
+        deadline = t + budget / 1000 if budget else None
+        while self._queue:
+            widget, (style_sheet, qss) = self._queue.popitem(last=False)
+            self._apply(widget, style_sheet, qss)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        self.elapsed += (time.perf_counter() - t) * 1000
+        if self._queue:
+            return
+
+        self._timer.stop()
+        self.finished.emit(self.elapsed)
 
-    for widget in removes:
-        style_sheet_manager.deregister(widget)
 
+style_sheet_scheduler = StyleSheetScheduler()
+
+
+def update_style_sheet(lazy=True, widget=None):
+    """ update the style sheet of all fluent widgets
+
+    Parameters
+    ----------
+    lazy: bool
+        whether to defer restyling the hidden widgets
+
+    widget: QWidget
+        only update the widgets of this window or container subtree
+    """
+    if widget is not None:
+        style_sheet_scheduler.restyle(style_sheet_manager.groups(widget), lazy)
+        QtWidgets.QWidget.update(widget)
+        return
+
+    if app_style_sheet.enabled:
+        app_style_sheet.apply()
+
+    style_sheet_scheduler.restyle(style_sheet_manager.groups(), lazy)
+
+
+def set_theme(theme: Theme, save=False, widget=None):
+    """ set the theme mode
+
+    Parameters
+    ----------
+    theme: Theme
+        theme mode
+
+    save: bool
+        whether to save the change to the config file
+
+    widget: QWidget
+        only set the theme of this window or container subtree, the global
+        theme is not changed
+    """
+    if widget is not None:
+        theme_scope_manager.set_theme(widget, theme)
+        update_style_sheet(widget=widget)
+        return
 
-def set_theme(theme: Theme, save=False):
     qconfig.set(qconfig.theme_mode, theme, save)
-    update_style_sheet()
+    qconfig.call_after_batch(update_style_sheet)
+
+
+def is_dark_theme(widget=None):
+    """ whether the theme of widget is dark mode, use the global theme if
+    widget is `None` or not in any theme scope """
+    return theme_scope_manager.palette(widget).theme() == Theme.DARK
 
 
-def theme_color():
+def theme_color(widget=None):
     """ get theme color """
-    return ThemeColor.PRIMARY.color()
+    return QtGui.QColor(
+        theme_scope_manager.palette(widget).color(ThemeColor.PRIMARY))
+
+
+def theme_brush(widget=None):
+    """ get the brush of theme color """
+    return theme_scope_manager.palette(widget).brush(ThemeColor.PRIMARY)
+
+
+def set_theme_color(color, save=False, widget=None):
+    """ set the theme color
 
+    Parameters
+    ----------
+    color: QColor | str
+        theme color
+
+    save: bool
+        whether to save the change to the config file
+
+    widget: QWidget
+        only set the theme color of this window or container subtree
+    """
+    if widget is not None:
+        theme_scope_manager.set_theme_color(widget, color)
+        update_style_sheet(widget=widget)
+        return
 
-def set_theme_color(color, save=False):
     color = QtGui.QColor(color)
-    qconfig.set(qconfig.themeColor, color, save=save)
-    update_style_sheet()
+    qconfig.set(qconfig.theme_color, color, save=save)
+    qconfig.call_after_batch(update_style_sheet)
+
+
+def uses_theme_color(style_sheet_obj, theme=Theme.DARK):
+    """ whether the style sheet substitutes any theme color """
+    try:
+        template = qss_template_cache.get(style_sheet_obj.path(theme))
+    except (IOError, OSError):
+        return True
+
+    names = {c.value for c in ThemeColor._member_map_.values()}
+    return not names.isdisjoint(template.variables())
+
+
+class ThemeColorPreview(QtCore.QObject):
+    """ Live preview of the theme color, e.g. while dragging a color picker
+
+    Previewed colors are coalesced to at most one restyle every `interval`
+    milliseconds and are not saved until `commit()` is called. Only the
+    widgets whose style sheet uses theme colors are restyled, the others are
+    just repainted.
+    """
+
+    def __init__(self, interval=16, parent=None):
+        super(ThemeColorPreview, self).__init__(parent=parent)
+        self._color = None
+        self._original = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._apply)
+
+    def is_active(self):
+        return self._original is not None
+
+    def preview(self, color):
+        """ preview the theme color """
+        if self._original is None:
+            self._original = QtGui.QColor(qconfig.get(qconfig.theme_color))
+
+        self._color = QtGui.QColor(color)
+        if not QtCore.QCoreApplication.instance():
+            self._apply()
+        elif not self._timer.isActive():
+            self._timer.start()
+
+    def commit(self, save=True):
+        """ keep the previewed theme color """
+        self._timer.stop()
+        color = self._color or qconfig.get(qconfig.theme_color)
+        changed = color != qconfig.get(qconfig.theme_color)
+        self._color = self._original = None
+
+        # the previewed color is already set without being saved
+        qconfig.set(qconfig.theme_color, color, save=False)
+        if save:
+            qconfig.saver.schedule()
+
+        if changed:
+            self._update()
+
+    def cancel(self):
+        """ restore the theme color before preview """
+        self._timer.stop()
+        if self._original is None:
+            return
+
+        self._color = self._original
+        self._original = None
+        self._apply()
+
+    def _apply(self):
+        if self._color is None:
+            return
+
+        qconfig.set(qconfig.theme_color, self._color, save=False)
+        self._update()
+
+    def _update(self):
+        if app_style_sheet.enabled:
+            app_style_sheet.apply()
+
+        theme = qconfig.theme
+        groups = [i for i in style_sheet_manager.groups()
+                  if uses_theme_color(i[0], theme)]
+        style_sheet_scheduler.restyle(groups)
+
+        # widgets painting with `theme_color()` only need to be repainted
+        app = QtWidgets.QApplication.instance()
+        for window in (app.topLevelWidgets() if app else []):
+            if window.isVisible():
+                window.update()
+
+
+theme_color_preview = ThemeColorPreview()
+
+
+def reset_theme_scope(widget):
+    """ make the window or container follow the global theme again """
+    theme_scope_manager.remove_scope(widget)
+    update_style_sheet(widget=widget)
+
+
+def _on_theme_changed(*args):
+    theme_palette.invalidate()
+    theme_scope_manager.invalidate()
+    style_sheet_cache.clear()
+
+
+def _on_config_changed(items):
+    if qconfig.theme_mode in items or qconfig.theme_color in items:
+        update_style_sheet()
+
+
+qconfig.theme_changed.connect(_on_theme_changed)
+qconfig.theme_color_changed.connect(_on_theme_changed)
+qconfig.external_changed.connect(_on_config_changed)
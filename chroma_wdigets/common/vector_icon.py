@@ -0,0 +1,389 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import re
+import sys
+
+from Qt import QtCore
+from Qt import QtGui
+from Qt.QtXml import QDomDocument
+
+from chroma_wdigets.common.config import qconfig, atomic_path, RESOURCES_PATH
+
+IMAGES_PATH = RESOURCES_PATH + '/images'
+
+_token_re = re.compile(
+    r'[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_transform_re = re.compile(r'(\w+)\s*\(([^)]*)\)')
+_number_re = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+class UnsupportedSvgError(ValueError):
+    """ The svg uses features the vector icon format can't express """
+
+
+class VectorPath(object):
+    """ Filled painter path of a vector icon """
+
+    def __init__(self, path, color=None):
+        self.path = path
+        self.color = color
+        self.brush = QtGui.QBrush(color) if color is not None else None
+
+
+class VectorIcon(object):
+    """ Svg icon pre-parsed into filled painter paths
+
+    Parameters
+    ----------
+    view_box: QRectF
+        view box of the svg
+
+    paths: List[VectorPath]
+        paths in painting order
+    """
+
+    def __init__(self, view_box, paths):
+        self.view_box = view_box
+        self.paths = paths
+
+    def render(self, painter, rect, indexes=None, fill=None):
+        """ fill the paths scaled into rect, `fill` overrides the color of
+        the paths at `indexes` or of all the paths if it's `None` """
+        x, y, w, h = QtCore.QRectF(rect).getRect()
+        vx, vy, vw, vh = self.view_box.getRect()
+        sx, sy = w / vw, h / vh
+        brush = QtGui.QBrush(QtGui.QColor(fill)) if fill is not None else None
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setTransform(
+            QtGui.QTransform(sx, 0, 0, sy, x - vx * sx, y - vy * sy), True)
+
+        for i, path in enumerate(self.paths):
+            b = path.brush
+            if brush is not None and (not indexes or i in indexes):
+                b = brush
+
+            if b is not None:
+                painter.fillPath(path.path, b)
+
+        painter.restore()
+
+
+def parse_transform(text):
+    """ parse the svg transform list into a QTransform """
+    transform = QtGui.QTransform()
+    for name, args in _transform_re.findall(text or ''):
+        v = [float(i) for i in _number_re.findall(args)]
+        if name == 'translate':
+            transform.translate(v[0], v[1] if len(v) > 1 else 0)
+        elif name == 'scale':
+            transform.scale(v[0], v[1] if len(v) > 1 else v[0])
+        elif name == 'rotate':
+            if len(v) == 3:
+                transform.translate(v[1], v[2])
+                transform.rotate(v[0])
+                transform.translate(-v[1], -v[2])
+            else:
+                transform.rotate(v[0])
+        elif name == 'matrix':
+            transform = QtGui.QTransform(*v) * transform
+        else:
+            raise UnsupportedSvgError('transform ' + name)
+
+    return transform
+
+
+def parse_path(d):
+    """ parse the svg path data into a QPainterPath """
+    tokens = _token_re.findall(d)
+    path = QtGui.QPainterPath()
+    i = 0
+    cmd = None
+    x = y = sx = sy = 0
+    # last control point of cubic and quadratic curves
+    cx = cy = None
+    qx = qy = None
+
+    def num():
+        nonlocal i
+        i += 1
+        return float(tokens[i - 1])
+
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            cmd = tokens[i]
+            i += 1
+        elif cmd is None:
+            raise UnsupportedSvgError('path data must start with a command')
+
+        c = cmd.upper()
+        rel = cmd.islower()
+        ox, oy = (x, y) if rel else (0, 0)
+
+        if c == 'Z':
+            path.closeSubpath()
+            x, y = sx, sy
+            cx = qx = None
+            continue
+
+        if c == 'M':
+            x, y = ox + num(), oy + num()
+            sx, sy = x, y
+            path.moveTo(x, y)
+            # subsequent pairs are implicit line-to commands
+            cmd = 'l' if rel else 'L'
+            cx = qx = None
+        elif c == 'L':
+            x, y = ox + num(), oy + num()
+            path.lineTo(x, y)
+            cx = qx = None
+        elif c == 'H':
+            x = ox + num()
+            path.lineTo(x, y)
+            cx = qx = None
+        elif c == 'V':
+            y = (y if rel else 0) + num()
+            path.lineTo(x, y)
+            cx = qx = None
+        elif c in 'CS':
+            if c == 'C':
+                x1, y1 = ox + num(), oy + num()
+            elif cx is None:
+                x1, y1 = x, y
+            else:
+                x1, y1 = 2 * x - cx, 2 * y - cy
+
+            cx, cy = ox + num(), oy + num()
+            x, y = ox + num(), oy + num()
+            path.cubicTo(x1, y1, cx, cy, x, y)
+            qx = None
+        elif c in 'QT':
+            if c == 'Q':
+                qx, qy = ox + num(), oy + num()
+            elif qx is None:
+                qx, qy = x, y
+            else:
+                qx, qy = 2 * x - qx, 2 * y - qy
+
+            x, y = ox + num(), oy + num()
+            path.quadTo(qx, qy, x, y)
+            cx = None
+        else:
+            raise UnsupportedSvgError('path command ' + cmd)
+
+    return path
+
+
+def parse_svg(svg_path):
+    """ parse the svg file into a VectorIcon """
+    f = QtCore.QFile(svg_path)
+    if not f.open(QtCore.QFile.ReadOnly):
+        raise IOError('Unable to open ' + svg_path)
+
+    dom = QDomDocument()
+    dom.setContent(f.readAll())
+    f.close()
+
+    root = dom.documentElement()
+    view_box = [float(i) for i in _number_re.findall(root.attribute('viewBox'))]
+    if len(view_box) == 4:
+        view_box = QtCore.QRectF(*view_box)
+    else:
+        view_box = QtCore.QRectF(
+            0, 0, float(root.attribute('width', '0').rstrip('px') or 0),
+            float(root.attribute('height', '0').rstrip('px') or 0))
+
+    if view_box.isEmpty():
+        raise UnsupportedSvgError('missing view box')
+
+    paths = []
+    _parse_children(root, QtGui.QTransform(), root.attribute('fill'), paths)
+    return VectorIcon(view_box, paths)
+
+
+def _parse_children(parent, transform, fill, paths):
+    node = parent.firstChild()
+    while not node.isNull():
+        element = node.toElement()
+        node = node.nextSibling()
+        if element.isNull():
+            continue
+
+        tag = element.tagName()
+        if element.hasAttribute('style') or element.hasAttribute('stroke'):
+            raise UnsupportedSvgError('styled ' + tag)
+
+        t = parse_transform(element.attribute('transform')) * transform
+        f = element.attribute('fill', fill)
+        if tag == 'g':
+            _parse_children(element, t, f, paths)
+        elif tag == 'path':
+            path = parse_path(element.attribute('d'))
+            if element.attribute('fill-rule') == 'evenodd':
+                path.setFillRule(QtCore.Qt.OddEvenFill)
+            else:
+                path.setFillRule(QtCore.Qt.WindingFill)
+
+            color = None if f == 'none' else QtGui.QColor(f or '#000000')
+            paths.append(VectorPath(t.map(path), color))
+        elif tag not in ('title', 'desc', 'defs'):
+            raise UnsupportedSvgError('element ' + tag)
+
+
+class VectorIconBundle(object):
+    """ Pre-parsed vector icons of the svg files in `resources/images`
+
+    The icons are serialized with `QDataStream` into one compressed bundle,
+    so loading it only deserializes painter paths instead of parsing svg
+    documents.
+    The bundle is built on first use and saved next to `qconfig.file`, it is
+    rebuilt when an svg file is modified. Svg files using features the
+    format can't express are left out and rendered by `QSvgRenderer`.
+    """
+
+    MAGIC = 0x43564931
+    VERSION = 1
+
+    def __init__(self):
+        self.enabled = False
+        self._icons = None
+
+    def path(self):
+        return os.path.join(os.path.dirname(qconfig.file), 'vector_icons.bin')
+
+    @staticmethod
+    def svg_files():
+        for folder, _, files in os.walk(IMAGES_PATH):
+            for name in sorted(files):
+                if name.endswith('.svg'):
+                    yield os.path.join(folder, name).replace('\\', '/')
+
+    @classmethod
+    def signature(cls):
+        """ get the signature of the svg files """
+        mtimes = [os.path.getmtime(i) for i in cls.svg_files()]
+        return '{}-{}'.format(len(mtimes), max(mtimes or [0]))
+
+    @staticmethod
+    def key(svg_path):
+        return os.path.relpath(svg_path, IMAGES_PATH).replace('\\', '/')
+
+    def build(self):
+        """ parse all the svg files """
+        icons = {}
+        for svg_path in self.svg_files():
+            try:
+                icons[self.key(svg_path)] = parse_svg(svg_path)
+            except (UnsupportedSvgError, ValueError, IndexError, IOError):
+                pass
+
+        return icons
+
+    def save(self, icons, path=None):
+        """ serialize the icons into the bundle file """
+        path = path or self.path()
+        data = QtCore.QByteArray()
+        stream = QtCore.QDataStream(data, QtCore.QIODevice.WriteOnly)
+        stream.writeUInt32(self.MAGIC)
+        stream.writeUInt32(self.VERSION)
+        stream.writeQString(self.signature())
+        stream.writeUInt32(len(icons))
+        for key, icon in icons.items():
+            stream.writeQString(key)
+            stream << icon.view_box
+            stream.writeUInt32(len(icon.paths))
+            for p in icon.paths:
+                stream << p.path
+                stream.writeBool(p.color is not None)
+                stream.writeUInt32(p.color.rgba() if p.color else 0)
+
+        try:
+            with atomic_path(path) as tmp:
+                with open(tmp, 'wb') as f:
+                    f.write(QtCore.qCompress(data).data())
+        except (IOError, OSError):
+            pass
+
+    def load(self, path=None):
+        """ deserialize the icons of the bundle file, `None` if the file is
+        missing or out of date """
+        try:
+            with open(path or self.path(), 'rb') as f:
+                data = QtCore.qUncompress(QtCore.QByteArray(f.read()))
+        except (IOError, OSError):
+            return None
+
+        stream = QtCore.QDataStream(data, QtCore.QIODevice.ReadOnly)
+        if (stream.readUInt32() != self.MAGIC or
+                stream.readUInt32() != self.VERSION or
+                stream.readQString() != self.signature()):
+            return None
+
+        icons = {}
+        for _ in range(stream.readUInt32()):
+            key = stream.readQString()
+            view_box = QtCore.QRectF()
+            stream >> view_box
+            paths = []
+            for _ in range(stream.readUInt32()):
+                path = QtGui.QPainterPath()
+                stream >> path
+                filled = stream.readBool()
+                rgba = stream.readUInt32()
+                paths.append(VectorPath(
+                    path, QtGui.QColor.fromRgba(rgba) if filled else None))
+
+            icons[key] = VectorIcon(view_box, paths)
+
+        if stream.status() != QtCore.QDataStream.Ok:
+            return None
+
+        return icons
+
+    def icons(self):
+        if self._icons is None:
+            self._icons = self.load()
+            if self._icons is None:
+                self._icons = self.build()
+                self.save(self._icons)
+
+        return self._icons
+
+    def get(self, svg_path):
+        """ get the vector icon of the svg file, `None` if it's not bundled """
+        return self.icons().get(self.key(svg_path))
+
+    def render(self, svg_path, painter, rect, indexes=None, **attributes):
+        """ render the vector icon, return `False` if it's not bundled or the
+        attributes are not supported """
+        if set(attributes) - {'fill'}:
+            return False
+
+        icon = self.get(svg_path)
+        if icon is None:
+            return False
+
+        icon.render(painter, rect, indexes, attributes.get('fill'))
+        return True
+
+
+vector_icon_bundle = VectorIconBundle()
+
+
+def set_vector_icons_enabled(enabled=True):
+    """ set whether to render the svg icons from the pre-parsed bundle """
+    vector_icon_bundle.enabled = enabled
+
+
+if __name__ == '__main__':
+    # python -m chroma_wdigets.common.vector_icon [output]
+    bundle = VectorIconBundle()
+    icons = bundle.build()
+    output = sys.argv[1] if len(sys.argv) > 1 else bundle.path()
+    bundle.save(icons, output)
+    print('{} of {} svg files written to {}'.format(
+        len(icons), len(list(bundle.svg_files())), output))
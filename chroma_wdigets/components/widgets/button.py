@@ -6,10 +6,10 @@ from Qt import QtWidgets
 from Qt import QtCore
 from Qt import QtGui
 
-from chroma_wdigets.common.theme import ChromaStyleSheet
+from chroma_wdigets.common.theme import ChromaStyleSheet, is_dark_theme
 from chroma_wdigets.common.icon import (
-    to_icon, draw_icon, ChromaIconBase, ChromaIcon)
-from chroma_wdigets.common.config import Theme, is_dark_theme
+    to_icon, draw_icon, get_icon_color, ChromaIconBase, ChromaIcon)
+from chroma_wdigets.common.config import Theme
 from chroma_wdigets.common.animation import TranslateYAnimation
 from chroma_wdigets.common.font import set_font
 
@@ -52,11 +52,12 @@ class ButtonBase(object):
 class PrimaryButtonBase(object):
     def draw_icon(self, icon, painter, rect):
         if isinstance(icon, ChromaIconBase) and self.isEnabled():
-            # reverse icon color
-            theme = Theme.DARK if not is_dark_theme() else Theme.LIGHT
-            icon = icon.icon(theme)
+            # reverse icon color by tinting the cached icon pixmap
+            theme = Theme.DARK if is_dark_theme(self) else Theme.LIGHT
+            icon.render(painter, rect, fill=get_icon_color(theme, True))
+            return
         elif not self.isEnabled():
-            painter.setOpacity(0.786 if is_dark_theme() else 0.9)
+            painter.setOpacity(0.786 if is_dark_theme(self) else 0.9)
             icon = icon.icon(Theme.DARK)
 
         super(PrimaryPushButton, self).draw_icon(icon, painter, rect)
@@ -231,7 +232,7 @@ class DropDownButtonBase(object):
             self.menu().hide()
 
     def _draw_drop_down_icon(self, painter, rect):
-        if is_dark_theme():
+        if is_dark_theme(self):
             ChromaIcon.ARROW_DOWN.render(painter, rect)
         else:
             ChromaIcon.ARROW_DOWN.render(painter, rect, fill="#646464")
@@ -275,7 +276,7 @@ class DropDownToolButton(DropDownButtonBase, ToolButton):
 
 class PrimaryDropDownButtonBase(DropDownButtonBase):
     def _draw_drop_down_icon(self, painter, rect):
-        theme = Theme.DARK if is_dark_theme() else Theme.LIGHT
+        theme = Theme.DARK if is_dark_theme(self) else Theme.LIGHT
         ChromaIcon.ARROW_DOWN.render(painter, rect, theme)
 
 
@@ -342,7 +343,7 @@ class PrimarySplitDropButton(PrimaryToolButton):
         else:
             painter.setOpacity(1)
 
-        theme = Theme.DARK if is_dark_theme() else Theme.LIGHT
+        theme = Theme.DARK if is_dark_theme(self) else Theme.LIGHT
         super(PrimarySplitDropButton, self).draw_icon(
             ChromaIcon.ARROW_DOWN.icon(theme), painter, rect)
 
@@ -8,7 +8,8 @@ from Qt import QtGui
 from Qt import QtWidgets
 from Qt import QtCore
 
-from chroma_wdigets.common.icon import ChromaIconBase, Theme, get_icon_color
+from chroma_wdigets.common.icon import (
+    ChromaIconBase, Theme, get_icon_color, register_icon_prewarm)
 from chroma_wdigets.common.config import RESOURCES_PATH
 from chroma_wdigets.common.theme import ChromaStyleSheet
 
@@ -24,6 +25,9 @@ class CheckBoxIcon(ChromaIconBase, Enum):
         )
 
 
+register_icon_prewarm(CheckBoxIcon, 20)
+
+
 class CheckBox(QtWidgets.QCheckBox):
     """ Check box """
 
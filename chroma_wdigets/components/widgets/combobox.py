@@ -10,10 +10,13 @@ from Qt import QtCore
 from chroma_wdigets.components.widgets.menu import RoundMenu, MenuItemDelegate, MenuAnimationType
 from chroma_wdigets.components.widgets.line_edit import LineEdit, LineEditButton
 from chroma_wdigets.common.animation import TranslateYAnimation
-from chroma_wdigets.common.icon import ChromaIcon
-from chroma_wdigets.common.theme import ChromaStyleSheet, theme_color, \
+from chroma_wdigets.common.icon import ChromaIcon, register_icon_prewarm
+from chroma_wdigets.common.theme import ChromaStyleSheet, theme_brush, \
     is_dark_theme
 
+register_icon_prewarm([ChromaIcon.ARROW_DOWN], 10)
+register_icon_prewarm([ChromaIcon.ARROW_DOWN], 10, fill="#646464")
+
 
 class ComboItem(object):
     def __init__(self, text, icon=None, userData=None):
@@ -52,7 +55,7 @@ class ComboMenuItemDelegate(MenuItemDelegate):
         )
 
         painter.setPen(QtCore.Qt.NoPen)
-        painter.setBrush(theme_color())
+        painter.setBrush(theme_brush(option.widget))
         painter.drawRoundedRect(2, 11 + option.rect.y(), 3, 16, 1.5, 1.5)
 
         painter.restore()
@@ -352,7 +355,7 @@ class ComboBox(QtWidgets.QPushButton, ComboBoxBase):
 
         rect = QtCore.QRectF(self.width() - 22,
                              self.height() / 2 - 5 + self.arrow_ani.y, 10, 10)
-        if is_dark_theme():
+        if is_dark_theme(self):
             ChromaIcon.ARROW_DOWN.render(painter, rect)
         else:
             ChromaIcon.ARROW_DOWN.render(painter, rect, fill="#646464")
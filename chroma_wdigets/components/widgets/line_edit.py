@@ -6,14 +6,18 @@ from PySide2.QtWidgets import QHBoxLayout, QLineEdit, QToolButton, QTextEdit, QP
 from chroma_wdigets.components.widgets.menu import LineEditMenu, TextEditMenu
 from chroma_wdigets.components.widgets.scroll_bar import SmoothScrollDelegate
 from chroma_wdigets.common.icon import ChromaIcon
-from chroma_wdigets.common.theme import is_dark_theme, theme_color, ChromaStyleSheet
-from chroma_wdigets.common.icon import draw_icon
+from chroma_wdigets.common.theme import is_dark_theme, theme_brush, ChromaStyleSheet
+from chroma_wdigets.common.icon import draw_icon, register_icon_prewarm
 from chroma_wdigets.common.font import set_font
 
 from Qt import QtGui
 from Qt import QtCore
 from Qt import QtWidgets
 
+LINE_EDIT_ICONS = [ChromaIcon.CLOSE, ChromaIcon.SEARCH, ChromaIcon.ARROW_DOWN]
+register_icon_prewarm(LINE_EDIT_ICONS, 10)
+register_icon_prewarm(LINE_EDIT_ICONS, 10, fill='#656565')
+
 
 class LineEditButton(QtWidgets.QToolButton):
     """ Line edit button """
@@ -49,7 +53,7 @@ class LineEditButton(QtWidgets.QToolButton):
         if self.is_pressed:
             painter.setOpacity(0.7)
 
-        if is_dark_theme():
+        if is_dark_theme(self):
             draw_icon(self._icon, painter, rect)
         else:
             draw_icon(self._icon, painter, rect, fill='#656565')
@@ -125,7 +129,7 @@ class LineEdit(QLineEdit):
         rect_path.addRect(m.left(), h-10, w, 8)
         path = path.subtracted(rect_path)
 
-        painter.fillPath(path, theme_color())
+        painter.fillPath(path, theme_brush(self))
 
 
 class SearchLineEdit(LineEdit):
@@ -8,7 +8,7 @@ from Qt import QtCore
 
 from chroma_wdigets.components.widgets.scroll_bar import SmoothScrollDelegate
 from chroma_wdigets.components.widgets.table_view import TableItemDelegate
-from chroma_wdigets.common.theme import ChromaStyleSheet, theme_color
+from chroma_wdigets.common.theme import ChromaStyleSheet, theme_brush
 
 
 class ListItemDelegate(TableItemDelegate):
@@ -23,7 +23,7 @@ class ListItemDelegate(TableItemDelegate):
     def _draw_indicator(self, painter, option, index):
         y, h = option.rect.y(), option.rect.height()
         ph = round(0.35 * h if self.pressed_row == index.row() else 0.257 * h)
-        painter.setBrush(theme_color())
+        painter.setBrush(theme_brush(self.parent()))
         painter.drawRoundedRect(0, ph + y, 3, h - 2 * ph, 1.5, 1.5)
 
 
@@ -8,12 +8,13 @@ from Qt import QtWidgets
 from Qt import QtGui
 from Qt import QtCore
 
-from chroma_wdigets.common.config import is_dark_theme
 from chroma_wdigets.common.icon import (
-    ChromaIcon, ChromaIconBase, MenuIconEngine)
-from chroma_wdigets.common.theme import ChromaStyleSheet
+    ChromaIcon, ChromaIconBase, MenuIconEngine, register_icon_prewarm)
+from chroma_wdigets.common.theme import ChromaStyleSheet, is_dark_theme
 from chroma_wdigets.components.widgets.scroll_bar import SmoothScrollDelegate
 
+register_icon_prewarm([ChromaIcon.CHEVRON_RIGHT], 9)
+
 
 class MenuAnimationType(Enum):
     """ Menu animation type """
@@ -232,7 +233,7 @@ class MenuItemDelegate(QtWidgets.QStyledItemDelegate):
 
         painter.save()
 
-        c = 0 if not is_dark_theme() else 255
+        c = 0 if not is_dark_theme(option.widget) else 255
         pen = QtGui.QPen(QtGui.QColor(c, c, c, 25), 1)
         pen.setCosmetic(True)
         painter.setPen(pen)
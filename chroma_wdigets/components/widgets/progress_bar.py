@@ -9,7 +9,7 @@ from Qt import QtWidgets
 from Qt import QtCore
 from Qt import QtGui
 
-from chroma_wdigets.common.theme import is_dark_theme, theme_color
+from chroma_wdigets.common.theme import is_dark_theme, theme_brush
 
 
 class ProgressBar(QtWidgets.QProgressBar):
@@ -117,7 +117,7 @@ class ProgressBar(QtWidgets.QProgressBar):
         painter.setRenderHints(QtGui.QPainter.Antialiasing)
 
         # draw background
-        bc = self.dark_background_color if is_dark_theme() else self.light_background_color
+        bc = self.dark_background_color if is_dark_theme(self) else self.light_background_color
         painter.setPen(bc)
         y = floor(self.height() / 2)
         painter.drawLine(0, y, self.width(), y)
@@ -127,7 +127,7 @@ class ProgressBar(QtWidgets.QProgressBar):
 
         # draw bar
         painter.setPen(QtCore.Qt.NoPen)
-        painter.setBrush(theme_color())
+        painter.setBrush(theme_brush(self))
         w = int(self.val / (self.maximum() - self.minimum()) * self.width())
         r = self.height() / 2
         painter.drawRoundedRect(0, 0, w, self.height(), r, r)
@@ -240,10 +240,10 @@ class IndeterminateProgressBar(QtWidgets.QProgressBar):
         painter.setPen(QtCore.Qt.NoPen)
 
         if self.ani_group.state() == QtCore.QPropertyAnimation.Running:
-            painter.setBrush(theme_color())
+            painter.setBrush(theme_brush(self))
         elif self.ani_group.state() == QtCore.QPropertyAnimation.Paused:
             painter.setBrush(
-                QtGui.QColor(252, 225, 0) if is_dark_theme() else QtGui.QColor(157, 93, 0))
+                QtGui.QColor(252, 225, 0) if is_dark_theme(self) else QtGui.QColor(157, 93, 0))
         elif self._is_error:
             painter.setBrush(QtGui.QColor(196, 43, 28))
 
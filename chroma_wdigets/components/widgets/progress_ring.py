@@ -27,7 +27,7 @@ class ProgressRing(ProgressBar):
     def _draw_text(self, painter, text):
         """ draw text """
         painter.setFont(self.font())
-        painter.setPen(QtCore.Qt.white if is_dark_theme() else QtCore.Qt.black)
+        painter.setPen(QtCore.Qt.white if is_dark_theme(self) else QtCore.Qt.black)
         painter.drawText(self.rect(), QtCore.Qt.AlignCenter, text)
 
     def paintEvent(self, e):
@@ -39,7 +39,7 @@ class ProgressRing(ProgressBar):
         rc = QtCore.QRectF(cw / 2, self.height() / 2 - w / 2, w, w)
 
         # draw background
-        bc = self.dark_background_color if is_dark_theme() else self.light_background_color
+        bc = self.dark_background_color if is_dark_theme(self) else self.light_background_color
         pen = QtGui.QPen(bc, cw, QtCore.Qt.SolidLine, QtCore.Qt.RoundCap, QtCore.Qt.RoundJoin)
         painter.setPen(pen)
         painter.drawArc(rc, 0, 360 * 16)
@@ -48,7 +48,7 @@ class ProgressRing(ProgressBar):
             return
 
         # draw bar
-        pen.setColor(theme_color())
+        pen.setColor(theme_color(self))
         painter.setPen(pen)
         degree = int(self.val / (self.maximum() - self.minimum()) * 360)
         painter.drawArc(rc, 90 * 16, -degree * 16)
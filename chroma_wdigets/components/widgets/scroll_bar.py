@@ -8,9 +8,14 @@ from Qt import QtCore
 from Qt import QtGui
 
 from chroma_wdigets.common.smooth_scroll import SmoothScroll
-from chroma_wdigets.common.icon import ChromaIcon
+from chroma_wdigets.common.icon import ChromaIcon, register_icon_prewarm
 from chroma_wdigets.common.theme import is_dark_theme
 
+ARROW_ICONS = [ChromaIcon.CARE_UP_SOLID, ChromaIcon.CARE_DOWN_SOLID,
+               ChromaIcon.CARE_LEFT_SOLID, ChromaIcon.CARE_RIGHT_SOLID]
+register_icon_prewarm(ARROW_ICONS, 7, fill="#858789")
+register_icon_prewarm(ARROW_ICONS, 8, fill="#858789")
+
 
 class ArrowButton(QtWidgets.QToolButton):
     """ Arrow button """
@@ -74,7 +79,7 @@ class ScrollBarGroove(QtWidgets.QWidget):
         painter.setRenderHints(QtGui.QPainter.Antialiasing)
         painter.setPen(QtCore.Qt.NoPen)
 
-        if not is_dark_theme():
+        if not is_dark_theme(self):
             painter.setBrush(QtGui.QColor(252, 252, 252, 217))
         else:
             painter.setBrush(QtGui.QColor(66, 66, 66, 66))
@@ -98,7 +103,7 @@ class ScrollBarHandle(QtWidgets.QWidget):
 
         r = (self.width() / 2 if self.orient == QtCore.Qt.Vertical
              else self.height() / 2)
-        c = (QtGui.QColor(255, 255, 255, 139) if is_dark_theme()
+        c = (QtGui.QColor(255, 255, 255, 139) if is_dark_theme(self)
              else QtGui.QColor(0, 0, 0, 114))
         painter.setBrush(c)
         painter.drawRoundedRect(self.rect(), r, r)
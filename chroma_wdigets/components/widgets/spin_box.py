@@ -9,8 +9,9 @@ from Qt import QtWidgets
 from Qt import QtCore
 from Qt import QtGui
 
-from chroma_wdigets.common.theme import ChromaStyleSheet, theme_color
-from chroma_wdigets.common.icon import ChromaIconBase, Theme, get_icon_color
+from chroma_wdigets.common.theme import ChromaStyleSheet, theme_brush
+from chroma_wdigets.common.icon import (
+    ChromaIconBase, Theme, get_icon_color, register_icon_prewarm)
 from chroma_wdigets.common.font import set_font
 from chroma_wdigets.common.config import RESOURCES_PATH
 from chroma_wdigets.components.widgets.menu import LineEditMenu
@@ -27,6 +28,9 @@ class SpinIcon(ChromaIconBase, Enum):
             RESOURCES_PATH, self.value, get_icon_color(theme))
 
 
+register_icon_prewarm(SpinIcon, 11)
+
+
 class SpinButton(QtWidgets.QToolButton):
     def __init__(self, icon, parent=None):
         super(SpinButton, self).__init__(parent=parent)
@@ -102,7 +106,7 @@ class SpinBoxUI(object):
         rect_path.addRect(0, h - 10, w, 8)
         path = path.subtracted(rect_path)
 
-        painter.fillPath(path, theme_color())
+        painter.fillPath(path, theme_brush(self))
 
 
 class SpinBox(QtWidgets.QSpinBox, SpinBoxUI):
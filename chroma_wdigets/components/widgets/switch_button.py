@@ -9,6 +9,7 @@ from Qt import QtGui
 from Qt import QtCore
 from Qt import QtWidgets
 
+from chroma_wdigets.common.animation import animation_ticker
 from chroma_wdigets.common.theme import ChromaStyleSheet
 from chroma_wdigets.common.config import PRIMARY_COLOR
 
@@ -26,30 +27,33 @@ class Indicator(QtWidgets.QToolButton):
         self._slider_on_color = QtGui.QColor(QtCore.Qt.white)
         self._slider_off_color = QtGui.QColor(PRIMARY_COLOR)
         self._slider_disabled_color = QtGui.QColor(QtGui.QColor(155, 154, 153))
-        self.timer = QtCore.QTimer(self)
+        self.duration = 150
+        self.easing_curve = QtCore.QEasingCurve(QtCore.QEasingCurve.OutQuad)
         self.padding = self.height() // 4
         self.slider_x = self.padding
         self.slider_radius = (self.height() - 2 * self.padding) // 2
         self.slider_end_x = self.width() - 2 * self.slider_radius
-        self.slider_step = self.width() / 50
-        self.timer.timeout.connect(self._update_slider_pos)
-
-    def _update_slider_pos(self):
-        """ update slider position """
-        if self.isChecked():
-            if self.slider_x + self.slider_step < self.slider_end_x:
-                self.slider_x += self.slider_step
-            else:
-                self.slider_x = self.slider_end_x
-                self.timer.stop()
-        else:
-            if self.slider_x - self.slider_step > self.slider_end_x:
-                self.slider_x -= self.slider_step
-            else:
-                self.slider_x = self.padding
-                self.timer.stop()
+        self._start_x = self.slider_x
+        self._start_time = 0
+
+    def _start_slider_animation(self):
+        """ move the slider from its current position to `slider_end_x` in
+        `duration` milliseconds on the frames of the animation ticker """
+        self._start_x = self.slider_x
+        self._start_time = animation_ticker.time()
+        animation_ticker.register(self._on_tick)
+
+    def _on_tick(self, now):
+        """ move the slider to its position at the time of the frame """
+        progress = min((now - self._start_time) / max(self.duration, 1), 1)
+        self.slider_x = self._start_x + (
+            self.slider_end_x - self._start_x
+        ) * self.easing_curve.valueForProgress(progress)
+
+        if progress >= 1:
+            animation_ticker.unregister(self._on_tick)
 
-        self.style().polish(self)
+        self.update()
 
     def setChecked(self, is_checked):
         """ set checked state """
@@ -62,7 +66,7 @@ class Indicator(QtWidgets.QToolButton):
             self.width() - 2 * self.slider_radius - self.padding
             if is_checked else self.padding
         )
-        self.timer.start(5)
+        self._start_slider_animation()
 
     def toggle(self):
         self.setChecked(not self.isChecked())
@@ -74,13 +78,12 @@ class Indicator(QtWidgets.QToolButton):
             self.width() - 2 * self.slider_radius - self.padding
             if self.isChecked() else self.padding
         )
-        self.timer.start(5)
+        self._start_slider_animation()
         self.checked_changed.emit(self.isChecked())
 
     def resizeEvent(self, e):
         self.padding = self.height() // 4
         self.slider_radius = (self.height() - 2 * self.padding) // 2
-        self.slider_step = self.width() / 50
         self.slider_end_x = (
             self.width() - 2 * self.slider_radius - self.padding
             if self.isChecked() else self.padding
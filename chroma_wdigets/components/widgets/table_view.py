@@ -9,7 +9,7 @@ from Qt import QtCore
 
 from chroma_wdigets.common.font import get_font
 from chroma_wdigets.common.theme import (
-    is_dark_theme, ChromaStyleSheet, theme_color
+    is_dark_theme, ChromaStyleSheet, theme_brush
 )
 from chroma_wdigets.components.widgets.line_edit import LineEdit
 from chroma_wdigets.components.widgets.scroll_bar import SmoothScrollDelegate
@@ -76,7 +76,7 @@ class TableItemDelegate(QtWidgets.QStyledItemDelegate):
         """ draw indicator """
         y, h = option.rect.y(), option.rect.height()
         ph = round(0.4 * h if self.pressed_row == index.row() else 0.26 * h)
-        painter.setBrush(theme_color())
+        painter.setBrush(theme_brush(self.parent()))
         painter.drawRoundedRect(5, ph + y, 3, h - 2 * ph, 1.5, 1.5)
 
     def initStyleOption(self, option, index):
@@ -86,7 +86,7 @@ class TableItemDelegate(QtWidgets.QStyledItemDelegate):
         option.font = index.data(QtCore.Qt.FontRole) or get_font(13)
 
         # text color
-        text_color = QtCore.Qt.white if is_dark_theme() else QtCore.Qt.black
+        text_color = QtCore.Qt.white if is_dark_theme(option.widget) else QtCore.Qt.black
         text_brush = index.data(QtCore.Qt.TextColorRole)
         if text_brush is not None:
             text_color = text_brush.color()
@@ -112,7 +112,7 @@ class TableItemDelegate(QtWidgets.QStyledItemDelegate):
         is_pressed = self.pressed_row == index.row()
         is_alternate = (index.row() % 2 == 0 and
                         self.parent().alternatingRowColors())
-        is_dark = is_dark_theme()
+        is_dark = is_dark_theme(option.widget)
 
         c = 255 if is_dark else 0
         alpha = 0
@@ -8,7 +8,7 @@ from Qt import QtGui
 from Qt import QtCore
 
 from chroma_wdigets.common.theme import (
-    ChromaStyleSheet, theme_color, is_dark_theme)
+    ChromaStyleSheet, theme_brush, is_dark_theme)
 from chroma_wdigets.common.font import get_font
 from chroma_wdigets.components.widgets.scroll_area import SmoothScrollDelegate
 
@@ -34,7 +34,7 @@ class TreeItemDelegate(QtWidgets.QStyledItemDelegate):
 
         # draw background
         h = option.rect.height() - 4
-        c = 255 if is_dark_theme() else 0
+        c = 255 if is_dark_theme(self.parent()) else 0
         painter.setBrush(QtGui.QColor(c, c, c, 9))
         painter.drawRoundedRect(
             0, option.rect.y() + 2, self.parent().width() - 8, h, 4, 4)
@@ -42,7 +42,7 @@ class TreeItemDelegate(QtWidgets.QStyledItemDelegate):
         # draw indicator
         if (option.state & QtWidgets.QStyle.State_Selected and
                 self.parent().horizontalScrollBar().value() == 0):
-            painter.setBrush(theme_color())
+            painter.setBrush(theme_brush(self.parent()))
             painter.drawRoundedRect(1, 8 + option.rect.y(), 3, h - 11, 1.5, 1.5)
 
         painter.restore()
@@ -54,7 +54,7 @@ class TreeItemDelegate(QtWidgets.QStyledItemDelegate):
         option.font = index.data(QtCore.Qt.FontRole) or get_font(13)
 
         # text color
-        text_color = QtCore.Qt.white if is_dark_theme() else QtCore.Qt.black
+        text_color = QtCore.Qt.white if is_dark_theme(self.parent()) else QtCore.Qt.black
         text_brush = index.data(QtCore.Qt.TextColorRole)
         if text_brush is not None:
             text_color = text_brush.color()
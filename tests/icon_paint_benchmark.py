@@ -0,0 +1,75 @@
+import time
+
+from Qt import QtWidgets
+from Qt import QtCore
+from Qt import QtGui
+
+from chroma_wdigets import TableWidget
+from chroma_wdigets import application
+from chroma_wdigets.common.icon import ChromaIcon, icon_pixmap_cache
+from chroma_wdigets.components.widgets.table_view import TableItemDelegate
+
+
+ICONS = [ChromaIcon.ADD, ChromaIcon.COPY, ChromaIcon.SETTING, ChromaIcon.FOLDER,
+         ChromaIcon.SEARCH, ChromaIcon.UPDATE]
+
+
+class IconItemDelegate(TableItemDelegate):
+    """ Table item delegate drawing a recolored icon in the first column """
+
+    def paint(self, painter, option, index):
+        super(IconItemDelegate, self).paint(painter, option, index)
+        if index.column() != 0:
+            return
+
+        rect = option.rect
+        icon = ICONS[index.row() % len(ICONS)]
+        icon.render(painter, QtCore.QRectF(
+            rect.x() + 12, rect.center().y() - 8, 16, 16), fill='#858789')
+
+
+class Table(TableWidget):
+    def __init__(self, rows=40, parent=None):
+        super(Table, self).__init__(parent)
+        self.setItemDelegate(IconItemDelegate(self))
+        self.setRowCount(rows)
+        self.setColumnCount(3)
+        for i in range(rows):
+            for j in range(3):
+                self.setItem(i, j, QtWidgets.QTableWidgetItem(
+                    '    Item {}-{}'.format(i, j)))
+
+        self.resize(600, 1400)
+
+
+def paint_time(table, ratio=1, repeat=50):
+    """ Return the average time of painting the table in milliseconds """
+    image = QtGui.QImage(table.size() * ratio,
+                         QtGui.QImage.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(ratio)
+    table.render(image)
+
+    t = time.perf_counter()
+    for _ in range(repeat):
+        table.render(image)
+
+    return (time.perf_counter() - t) / repeat * 1000
+
+
+if __name__ == '__main__':
+    with application() as app:
+        table = Table()
+        table.show()
+        app.processEvents()
+
+        for ratio in (1, 2):
+            icon_pixmap_cache.enabled = False
+            print('vector icons @{}x: {:.2f} ms'.format(
+                ratio, paint_time(table, ratio)))
+
+            icon_pixmap_cache.enabled = True
+            print('cached pixmaps @{}x: {:.2f} ms'.format(
+                ratio, paint_time(table, ratio)))
+
+        print(icon_pixmap_cache.stats())
+        QtCore.QTimer.singleShot(0, app.quit)
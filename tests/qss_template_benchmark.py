@@ -0,0 +1,45 @@
+import os
+import codecs
+import timeit
+
+from chroma_wdigets.common.config import Theme
+from chroma_wdigets.common.theme import (
+    ChromaStyleSheet, ThemeColor, ThemePath, QssTemplate, CompiledQss,
+    theme_mappings
+)
+
+
+def style_sheets():
+    for style_sheet in ChromaStyleSheet:
+        for theme in Theme:
+            path = style_sheet.path(theme)
+            if os.path.exists(path):
+                with codecs.open(path, encoding='utf-8') as f:
+                    yield f.read()
+
+
+def string_template(qss_list):
+    """ the former implementation of `apply_theme_color` """
+    for qss in qss_list:
+        color_mappings = {c.value: c.color().name() for c in ThemeColor}
+        path_mappings = {p.value: p.path() for p in ThemePath}
+        QssTemplate(qss).safe_substitute({**color_mappings, **path_mappings})
+
+
+def compiled_template(templates):
+    for template in templates:
+        template.render(theme_mappings())
+
+
+if __name__ == '__main__':
+    qss_list = list(style_sheets())
+    templates = [CompiledQss(qss) for qss in qss_list]
+    number = 200
+
+    t1 = timeit.timeit(lambda: string_template(qss_list), number=number)
+    t2 = timeit.timeit(lambda: compiled_template(templates), number=number)
+    print('{} style sheets x {} renders'.format(len(qss_list), number))
+    print('string.Template: {:.0f} style sheets/s'.format(
+        len(qss_list) * number / t1))
+    print('CompiledQss: {:.0f} style sheets/s'.format(
+        len(qss_list) * number / t2))
@@ -0,0 +1,96 @@
+import time
+
+from Qt import QtWidgets
+from Qt import QtCore
+
+from chroma_wdigets import SwitchButton
+from chroma_wdigets import application
+from chroma_wdigets.common.animation import animation_ticker
+from chroma_wdigets.components.widgets.switch_button import Indicator
+
+
+class TimerIndicator(Indicator):
+    """ Indicator moved by a 5 ms timer and repolished on every step """
+
+    def __init__(self, parent):
+        super(TimerIndicator, self).__init__(parent)
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self._update_slider_pos)
+
+    def _start_slider_animation(self):
+        self.timer.start(5)
+
+    def _update_slider_pos(self):
+        step = self.width() / 50
+        if self.isChecked():
+            if self.slider_x + step < self.slider_end_x:
+                self.slider_x += step
+            else:
+                self.slider_x = self.slider_end_x
+                self.timer.stop()
+        else:
+            if self.slider_x - step > self.slider_end_x:
+                self.slider_x -= step
+            else:
+                self.slider_x = self.padding
+                self.timer.stop()
+
+        self.style().polish(self)
+
+
+class Widget(QtWidgets.QWidget):
+    def __init__(self, timer=False, count=40, parent=None):
+        super(Widget, self).__init__(parent)
+        self.layout = QtWidgets.QVBoxLayout(self)
+        self.switches = []
+
+        for _ in range(count):
+            button = SwitchButton('Switch')
+            if timer:
+                # replace the indicator before it's shown
+                button.h_box.removeWidget(button.indicator)
+                button.indicator.deleteLater()
+                button.indicator = TimerIndicator(button)
+                button.h_box.insertWidget(0, button.indicator)
+
+            self.switches.append(button)
+            self.layout.addWidget(button)
+
+
+def is_animating(widget):
+    timers = [getattr(s.indicator, 'timer', None) for s in widget.switches]
+    return (any(t and t.isActive() for t in timers) or
+            animation_ticker.is_active())
+
+
+def toggle_cpu_time(app, timer=False, repeat=5):
+    """ Return the average CPU time of toggling all the switches and running
+    their animations to the end in milliseconds """
+    w = Widget(timer)
+    w.show()
+    app.processEvents()
+
+    total = 0
+    for _ in range(repeat):
+        t = time.process_time()
+        for button in w.switches:
+            button.toggle_checked()
+
+        while is_animating(w):
+            app.processEvents(QtCore.QEventLoop.WaitForMoreEvents)
+
+        total += time.process_time() - t
+
+    w.close()
+    w.deleteLater()
+    app.processEvents()
+    return total / repeat * 1000
+
+
+if __name__ == '__main__':
+    with application() as app:
+        print('5 ms timer and polish: {:.1f} ms'.format(
+            toggle_cpu_time(app, True)))
+        print('animation ticker and update: {:.1f} ms'.format(
+            toggle_cpu_time(app)))
+        QtCore.QTimer.singleShot(0, app.quit)
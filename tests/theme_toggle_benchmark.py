@@ -0,0 +1,54 @@
+import time
+
+from Qt import QtWidgets
+from Qt import QtCore
+
+from chroma_wdigets import PushButton, CheckBox, LineEdit, ComboBox
+from chroma_wdigets import application
+from chroma_wdigets.common.config import Theme
+from chroma_wdigets.common.theme import set_theme, set_app_style_sheet_enabled
+
+
+class Widget(QtWidgets.QDialog):
+    def __init__(self, rows=50, parent=None):
+        super(Widget, self).__init__(parent)
+        self.layout = QtWidgets.QGridLayout(self)
+
+        for i in range(rows):
+            self.layout.addWidget(PushButton('Button'), i, 0)
+            self.layout.addWidget(CheckBox('Check box'), i, 1)
+            self.layout.addWidget(LineEdit(), i, 2)
+            self.layout.addWidget(ComboBox(), i, 3)
+
+
+def toggle_latency(app, repeat=10):
+    """ Return the average latency of switching theme in milliseconds """
+    w = Widget()
+    w.show()
+    app.processEvents()
+
+    total = 0
+    for i in range(repeat):
+        t = time.perf_counter()
+        set_theme(Theme.LIGHT if i % 2 == 0 else Theme.DARK)
+        app.processEvents()
+        total += time.perf_counter() - t
+
+    set_theme(Theme.DARK)
+    w.close()
+    w.deleteLater()
+    app.processEvents()
+    return total / repeat * 1000
+
+
+if __name__ == '__main__':
+    with application() as app:
+        print('update_style_sheet: {:.1f} ms'.format(toggle_latency(app)))
+
+        set_app_style_sheet_enabled(True)
+        print('application style sheet: {:.1f} ms'.format(
+            toggle_latency(app)))
+
+        set_app_style_sheet_enabled(True, dual_theme=True)
+        print('dual theme style sheet: {:.1f} ms'.format(toggle_latency(app)))
+        QtCore.QTimer.singleShot(0, app.quit)
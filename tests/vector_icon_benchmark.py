@@ -0,0 +1,63 @@
+import os
+import time
+import tempfile
+
+from Qt import QtCore
+from Qt import QtGui
+from Qt.QtSvg import QSvgRenderer
+
+from chroma_wdigets import application
+from chroma_wdigets.common.icon import ChromaIcon, _write_svg
+from chroma_wdigets.common.vector_icon import VectorIconBundle
+
+
+def timed(func, repeat=1):
+    """ Return the average time of calling func in milliseconds """
+    t = time.perf_counter()
+    for _ in range(repeat):
+        func()
+
+    return (time.perf_counter() - t) / repeat * 1000
+
+
+def load_svg(files):
+    return [QSvgRenderer(i) for i in files]
+
+
+if __name__ == '__main__':
+    with application() as app:
+        bundle = VectorIconBundle()
+        files = list(bundle.svg_files())
+        path = os.path.join(tempfile.mkdtemp(), 'vector_icons.bin')
+        bundle.save(bundle.build(), path)
+        icons = bundle.load(path)
+
+        print('load {} svg files: {:.1f} ms'.format(
+            len(files), timed(lambda: load_svg(files), 10)))
+        print('load vector bundle: {:.1f} ms'.format(
+            timed(lambda: bundle.load(path), 10)))
+
+        image = QtGui.QImage(64, 64, QtGui.QImage.Format_ARGB32_Premultiplied)
+        painter = QtGui.QPainter(image)
+        rect = QtCore.QRectF(0, 0, 16, 16)
+        colors = ['#{:02x}8789'.format(i) for i in range(256)]
+
+        for icon in (ChromaIcon.ADD, ChromaIcon.SETTING):
+            svg = icon.path()
+            renderer = QSvgRenderer(svg)
+            vector = icons[bundle.key(svg)]
+
+            print('{} render svg: {:.1f} us'.format(
+                icon.name, timed(lambda: renderer.render(painter, rect), 500) * 1000))
+            print('{} render vector: {:.1f} us'.format(
+                icon.name, timed(lambda: vector.render(painter, rect), 500) * 1000))
+
+            print('{} recolor svg: {:.1f} us'.format(icon.name, timed(
+                lambda: [QSvgRenderer(_write_svg(svg, fill=c).encode()).render(
+                    painter, rect) for c in colors]) / len(colors) * 1000))
+            print('{} recolor vector: {:.1f} us'.format(icon.name, timed(
+                lambda: [vector.render(painter, rect, fill=c)
+                         for c in colors]) / len(colors) * 1000))
+
+        painter.end()
+        QtCore.QTimer.singleShot(0, app.quit)